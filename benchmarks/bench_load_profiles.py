@@ -0,0 +1,36 @@
+"""
+Порівняння профілів завантаження Chrome на реальній сторінці.
+
+    python -m benchmarks.bench_load_profiles https://poweron.loe.lviv.ua/ 5
+    python -m benchmarks.bench_load_profiles https://poweron.loe.lviv.ua/ 5 text full
+
+Для кожного профілю піднімається окремий пул, сторінка відкривається N разів
+(перший раз - холодний кеш). Потрібні Chrome і undetected_chromedriver.
+"""
+import sys
+
+from core.browser import LOAD_PROFILES, DriverPool
+
+def bench(url, runs, profile):
+    pool = DriverPool(f"bench-{profile}", headless=True, profile=profile, max_uses=runs + 1)
+    try:
+        for _ in range(runs):
+            with pool.lease() as driver:
+                pool.load_page(driver, url)
+    finally:
+        pool.shutdown()
+
+    print(f"{profile:6}: {pool.stats.as_line()}")
+
+def main(args):
+    if not args:
+        print(__doc__)
+        return
+    url = args[0]
+    runs = int(args[1]) if len(args) > 1 else 3
+    profiles = args[2:] or list(LOAD_PROFILES)
+    for profile in profiles:
+        bench(url, runs, profile)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
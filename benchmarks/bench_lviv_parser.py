@@ -0,0 +1,48 @@
+"""
+Порівняння старого (BeautifulSoup) і нового (lxml + XPath) парсера Львова.
+
+    python -m benchmarks.bench_lviv_parser saved_page1.html saved_page2.html
+    python -m benchmarks.bench_lviv_parser            # синтетична сторінка
+
+Сторінку можна зберегти з driver.page_source воркера.
+"""
+import sys
+import timeit
+from pathlib import Path
+
+from regions.lviv.parser import parse_lviv_text_data, parse_lviv_page
+
+def synthetic_page():
+    nav = "".join(f"<li><a href='/n{i}'>Пункт меню {i}</a></li>" for i in range(300))
+    news = "".join(f"<article><h3>Новина {i}</h3><p>{'Текст новини. ' * 40}</p></article>" for i in range(60))
+    groups = "".join(
+        f"<p>Група {g}.{s}. Електроенергії немає з {8 + g}:00 до {10 + g}:30, з 18:00 до 20:00.</p>"
+        for g in range(1, 7) for s in (1, 2)
+    )
+    return (
+        f"<html><head><title>Графік</title><script>{'var x=1;' * 2000}</script></head><body>"
+        f"<nav><ul>{nav}</ul></nav><main><section>{news}</section>"
+        f"<section id='schedule'><h2>Графік погодинних відключень на 18.10.2026</h2>"
+        f"<p>Інформація станом на 10:30</p>{groups}</section></main></body></html>"
+    )
+
+def bench(name, html, number):
+    old = parse_lviv_text_data(html)
+    new = parse_lviv_page(html)
+    same = old == (new.date, new.update_time, new.groups)
+
+    t_old = min(timeit.repeat(lambda: parse_lviv_text_data(html), number=number, repeat=3)) / number
+    t_new = min(timeit.repeat(lambda: parse_lviv_page(html), number=number, repeat=3)) / number
+    print(f"{name}: {len(html) / 1024:.0f} KB, groups={len(new.groups)}, same_result={same}")
+    print(f"  bs4 : {t_old * 1000:8.2f} ms")
+    print(f"  lxml: {t_new * 1000:8.2f} ms  (x{t_old / t_new:.1f})")
+
+def main(paths):
+    if not paths:
+        bench("synthetic", synthetic_page(), number=20)
+        return
+    for path in paths:
+        bench(path, Path(path).read_text(encoding="utf-8"), number=10)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
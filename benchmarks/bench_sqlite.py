@@ -0,0 +1,96 @@
+"""
+Затримка читання графіка під час конкурентних записів для профілів SQLite.
+
+    python -m benchmarks.bench_sqlite            # усі профілі, 10 секунд кожен
+    python -m benchmarks.bench_sqlite 5 fast
+
+Писач у циклі перезаписує графіки 12 груп (як воркер регіону) і комітить,
+читачі паралельно вибирають графік групи (як хендлер "Графік").
+База створюється в тимчасовій теці.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import OperationalError
+
+from core.schedule_bits import encode
+from database.db import SQLITE_PROFILES, make_engine
+from database.models import Base, Schedule
+
+GROUPS = [f"{i}.{j}" for i in range(1, 7) for j in (1, 2)]
+READERS = 4
+
+async def writer(engine, stop, stats):
+    n = 0
+    while not stop.is_set():
+        n += 1
+        off, unknown = encode(["on" if (n + i) % 3 else "off" for i in range(48)])
+        rows = [
+            {"date": "2026-10-18", "region": "lviv", "group_code": g,
+             "off_mask": off, "unknown_mask": unknown,
+             "site_updated_at": f"{n % 24:02d}:00"}
+            for g in GROUPS
+        ]
+        stmt = insert(Schedule).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Schedule.date, Schedule.region, Schedule.group_code],
+            set_={"off_mask": stmt.excluded.off_mask, "unknown_mask": stmt.excluded.unknown_mask},
+        )
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(stmt)
+            stats["writes"] += 1
+        except OperationalError:
+            stats["write_errors"] += 1
+        await asyncio.sleep(0)
+
+async def reader(engine, stop, latencies, stats):
+    i = 0
+    while not stop.is_set():
+        group = GROUPS[i % len(GROUPS)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(select(Schedule.off_mask, Schedule.unknown_mask).where(
+                    Schedule.date == "2026-10-18", Schedule.region == "lviv", Schedule.group_code == group))
+            latencies.append((time.perf_counter() - started) * 1000)
+        except OperationalError:
+            stats["read_errors"] += 1
+
+async def bench(profile, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}", profile)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        stop = asyncio.Event()
+        latencies = []
+        stats = {"writes": 0, "write_errors": 0, "read_errors": 0}
+        tasks = [asyncio.create_task(writer(engine, stop, stats))]
+        tasks += [asyncio.create_task(reader(engine, stop, latencies, stats)) for _ in range(READERS)]
+        await asyncio.sleep(seconds)
+        stop.set()
+        await asyncio.gather(*tasks)
+        await engine.dispose()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0
+    print(f"{profile:8}: reads={len(latencies)} p50={statistics.median(latencies):.2f} ms "
+          f"p95={p95:.2f} ms max={max(latencies):.1f} ms | writes={stats['writes']} "
+          f"errors: write={stats['write_errors']} read={stats['read_errors']}")
+
+async def main(args):
+    seconds = float(args[0]) if args else 10
+    profiles = args[1:] or list(SQLITE_PROFILES)
+    for profile in profiles:
+        await bench(profile, seconds)
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
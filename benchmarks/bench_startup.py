@@ -0,0 +1,41 @@
+"""
+Час імпорту і пам'ять процесу бота до першого /start.
+
+    python -m benchmarks.bench_startup          # 5 запусків, найкращий результат
+
+Кожен запуск - окремий інтерпретатор, який імпортує те саме, що й main.py
+(хендлери, сервіси, реєстр регіонів), але не стартує polling.
+"""
+import json
+import subprocess
+import sys
+
+HEAVY = ("cv2", "numpy", "PIL", "pytesseract", "selenium", "undetected_chromedriver", "pyvirtualdisplay", "bs4", "lxml")
+
+PROBE = f"""
+import json, resource, sys, time
+t = time.perf_counter()
+from handlers import admin, schedules, user_settings, common
+import regions.registry, services.broadcaster, services.alerts, services.polling, services.scheduler
+elapsed = time.perf_counter() - t
+with open("/proc/self/status") as f:
+    rss = next(int(line.split()[1]) for line in f if line.startswith("VmRSS"))
+print(json.dumps({{
+    "ms": elapsed * 1000,
+    "rss_mb": rss / 1024,
+    "heavy": [m for m in {HEAVY!r} if m in sys.modules],
+}}))
+"""
+
+def main(runs=5):
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    best = min(results, key=lambda r: r["ms"])
+    print(f"import: {best['ms']:.0f} ms (best of {runs}), RSS: {best['rss_mb']:.0f} MB")
+    print(f"heavy modules loaded: {', '.join(best['heavy']) or 'none'}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,116 @@
+"""
+Перевірка і порівняння старого (попіксельний цикл) і нового (sample_grid)
+зчитування сітки Волині на синтетичних зображеннях з відомою відповіддю.
+
+    python -m benchmarks.bench_volyn_grid
+    python -m benchmarks.bench_volyn_grid --seed 7
+
+Кожен випадок малює обидві таблиці 12x24 зі зсувом/масштабом відносно
+констант парсера. Старий і новий методи мають видати однаковий результат
+на незсунутій сітці; при зсуві рахуємо, скільки клітинок кожен прочитав хибно.
+sample_grid (з прогрітим кешем калібрування) не має бути повільнішим за старий цикл.
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from regions.volyn.parser import (
+    BOT_TABLE_START_X, BOT_TABLE_START_Y, LOCAL_STEP_X, LOCAL_STEP_Y,
+    TOP_TABLE_START_X, TOP_TABLE_START_Y, sample_grid,
+)
+
+ON_COLOR = (235, 240, 238)
+OFF_COLOR = (70, 60, 120)
+LINE_COLOR = (40, 40, 40)
+
+# (dx, dy, масштаб кроку)
+CASES = [(0, 0, 1.0), (4, -3, 1.0), (10, 8, 1.0), (-15, 12, 1.0), (18, -18, 1.0), (25, -25, 1.0),
+         (6, 4, 1.02), (-8, 5, 0.98)]
+
+def old_parse(img):
+    """Цикл з parse_image до векторизації (user-007), без змін."""
+    height, width, _ = img.shape
+    schedule = {}
+    for row in range(12):
+        group_name = f"{row // 2 + 1}.{row % 2 + 1}"
+        statuses = []
+        for col in range(48):
+            if col < 24:
+                start_x, start_y = TOP_TABLE_START_X, TOP_TABLE_START_Y
+                current_col = col
+            else:
+                start_x, start_y = BOT_TABLE_START_X, BOT_TABLE_START_Y
+                current_col = col - 24
+            x = int(start_x + (current_col * LOCAL_STEP_X))
+            y = int(start_y + (row * LOCAL_STEP_Y))
+            if y >= height or x >= width:
+                statuses.append('unknown')
+                continue
+            b, g, r = img[y, x]
+            brightness = (int(r) + int(g) + int(b)) / 3
+            statuses.append('on' if brightness > 160 else 'off')
+        schedule[group_name] = statuses
+    return schedule
+
+def synthetic_image(truth, dx, dy, scale, rng):
+    """truth: (12, 48) bool, True = світло є."""
+    step_x, step_y = LOCAL_STEP_X * scale, LOCAL_STEP_Y * scale
+    height = int(BOT_TABLE_START_Y + 13 * LOCAL_STEP_Y) + 80
+    width = int(TOP_TABLE_START_X + 25 * LOCAL_STEP_X) + 80
+    img = np.full((height, width, 3), 255, dtype=np.uint8)
+
+    for x0, y0, cols in ((TOP_TABLE_START_X, TOP_TABLE_START_Y, range(24)),
+                         (BOT_TABLE_START_X, BOT_TABLE_START_Y, range(24, 48))):
+        # константи - центри першої клітинки, межі на півкроку раніше
+        left, top = x0 + dx - step_x / 2, y0 + dy - step_y / 2
+        for row in range(12):
+            for i, col in enumerate(cols):
+                x1, y1 = int(round(left + i * step_x)), int(round(top + row * step_y))
+                x2, y2 = int(round(left + (i + 1) * step_x)), int(round(top + (row + 1) * step_y))
+                img[y1:y2, x1:x2] = ON_COLOR if truth[row, col] else OFF_COLOR
+        for i in range(25):
+            x = int(round(left + i * step_x))
+            img[int(top):int(top + 12 * step_y) + 1, max(x - 1, 0):x + 2] = LINE_COLOR
+        for row in range(13):
+            y = int(round(top + row * step_y))
+            img[max(y - 1, 0):y + 2, int(left):int(left + 24 * step_x) + 1] = LINE_COLOR
+
+    noise = rng.integers(-12, 13, img.shape, dtype=np.int16)
+    return np.clip(img.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+def misread(schedule, truth):
+    expected = np.where(truth, 'on', 'off')
+    got = np.array([schedule[f"{row // 2 + 1}.{row % 2 + 1}"] for row in range(12)])
+    return int((got != expected).sum())
+
+def main(seed, number):
+    rng = np.random.default_rng(seed)
+    all_ok = True
+    for dx, dy, scale in CASES:
+        truth = rng.random((12, 48)) < 0.6
+        img = synthetic_image(truth, dx, dy, scale, rng)
+
+        old = old_parse(img)
+        sample = sample_grid(img)
+        cal = sample.calibration
+        old_bad, new_bad = misread(old, truth), misread(sample.schedule, truth)
+        same = old == sample.schedule
+        t_old = min(timeit.repeat(lambda: old_parse(img), number=number, repeat=5)) / number
+        t_new = min(timeit.repeat(lambda: sample_grid(img), number=number, repeat=5)) / number
+        all_ok &= new_bad == 0 and (same or (dx, dy, scale) != (0, 0, 1.0)) and t_new <= t_old
+        print(f"shift=({dx:+d},{dy:+d}) scale={scale:.2f}: same_result={same}, "
+              f"хибних клітинок old={old_bad} new={new_bad}, min confidence={sample.confidence.min():.2f}")
+        print(f"  calibration: top=({cal.top_x:.0f},{cal.top_y:.0f}) bot=({cal.bot_x:.0f},{cal.bot_y:.0f}) "
+              f"step=({cal.step_x:.1f},{cal.step_y:.1f}) score={cal.score:.2f}")
+        print(f"  old loop    : {t_old * 1000:8.2f} ms")
+        print(f"  sample_grid : {t_new * 1000:8.2f} ms  (x{t_old / t_new:.1f}, кеш калібрування прогрітий)")
+    print("OK" if all_ok else "MISMATCH")
+    return 0 if all_ok else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+    raise SystemExit(main(args.seed, args.number))
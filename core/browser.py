@@ -3,25 +3,25 @@ import logging
 import shutil
 import os
 import glob
-import undetected_chromedriver as uc
+import time
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from core.config import config
+from core.processes import process_registry
 
 logger = logging.getLogger(__name__)
 
 def kill_zombie_processes():
-    """Kills lingering Chrome/Chromedriver processes to free up RAM."""
-    targets = ['chrome', 'chromedriver', 'Xvfb', 'xvfb']
-    killed_count = 0
-    
-    for proc in psutil.process_iter(['pid', 'name']):
-        try:
-            if proc.info['name'] and any(t in proc.info['name'] for t in targets):
-                proc.kill()
-                killed_count += 1
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            pass
-            
-    if killed_count > 0:
-        logger.info(f"[Cleaner] Killed {killed_count} hanging processes.")
+    """
+    Kills leftover Chrome/Chromedriver/Xvfb processes spawned by our drivers.
+
+    Only processes recorded in the process registry are touched, so other
+    software on the host and browsers of active pool leases are left alone.
+    Blocking: call it via asyncio.to_thread from async code.
+    """
+    return process_registry.reap()
 
 def clean_temp_files():
     """Cleans up temporary Chrome user data directories."""
@@ -40,7 +40,47 @@ def clean_temp_files():
     if deleted_count > 0:
         logger.info(f"[Cleaner] Deleted {deleted_count} temp Chrome folders.")
 
-def get_safe_driver(version_main=144, headless=False):
+# --- Профілі завантаження сторінок ---
+
+# Шрифти і трекери не потрібні жодному парсеру
+FONT_URLS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*fonts.googleapis.com*", "*fonts.gstatic.com*"]
+TRACKER_URLS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*connect.facebook.net*", "*mc.yandex.*", "*top-fwz1.mail.ru*",
+]
+
+@dataclass(frozen=True)
+class LoadProfile:
+    """Як саме Chrome вантажить сторінку: що блокувати, коли вважати її готовою, кеш."""
+    name: str
+    block_images: bool = False
+    blocked_urls: tuple = ()
+    page_load_strategy: str = "normal"   # "eager" - не чекаємо картинок і iframe
+    window_size: str = "1920,1080"
+    disk_cache: bool = False
+
+LOAD_PROFILES = {
+    # поведінка як раніше: все вантажиться, профіль викидається
+    "full": LoadProfile("full"),
+    # текстові сторінки (Львів): нам потрібен лише DOM
+    "text": LoadProfile(
+        "text",
+        block_images=True,
+        blocked_urls=tuple(FONT_URLS + TRACKER_URLS),
+        page_load_strategy="eager",
+        window_size="1024,768",
+        disk_cache=True,
+    ),
+    # сторінка з картинкою графіка (Волинь): <img> і iframe мають відрендеритись
+    "image": LoadProfile(
+        "image",
+        blocked_urls=tuple(FONT_URLS + TRACKER_URLS),
+        window_size="1280,1024",
+        disk_cache=True,
+    ),
+}
+
+def get_safe_driver(version_main=144, headless=False, profile=None, cache_name="default"):
     """
     Creates and returns a configured Chrome driver instance.
     
@@ -48,11 +88,30 @@ def get_safe_driver(version_main=144, headless=False):
         version_main (int): The major version of Chrome installed on the OS.
                             Must match to avoid SessionNotCreatedException.
         headless (bool): Whether to run in headless mode (without UI).
+        profile (LoadProfile): Page load profile, "full" by default.
+        cache_name (str): Subfolder of CHROME_PROFILE_PATH for the persistent disk cache.
     """
+    # selenium/uc are heavy, import them only when a browser is really needed
+    import undetected_chromedriver as uc
+
+    profile = profile or LOAD_PROFILES["full"]
     options = uc.ChromeOptions()
     
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
+    options.add_argument(f"--window-size={profile.window_size}")
+    options.page_load_strategy = profile.page_load_strategy
+
+    if profile.block_images:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        options.add_argument("--blink-settings=imagesEnabled=false")
+
+    if profile.disk_cache:
+        # кеш живе між перезапусками браузера, решта профілю - тимчасова
+        cache_dir = os.path.join(config.CHROME_PROFILE_PATH, "cache", cache_name)
+        os.makedirs(cache_dir, exist_ok=True)
+        options.add_argument(f"--disk-cache-dir={cache_dir}")
+        options.add_argument(f"--disk-cache-size={config.CHROME_DISK_CACHE_MB * 2**20}")
     
     if headless:
         options.add_argument("--headless")
@@ -61,5 +120,287 @@ def get_safe_driver(version_main=144, headless=False):
         options=options,
         version_main=version_main
     )
+
+    if profile.blocked_urls:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(profile.blocked_urls)})
+        except Exception as e:
+            logger.warning(f"[Browser] Failed to set blocked URLs: {e}")
     
-    return driver
\ No newline at end of file
+    return driver
+
+# Скільки байт прийшло з мережі (з кешу transferSize = 0)
+TRANSFER_SIZE_JS = """
+return performance.getEntriesByType('navigation')
+    .concat(performance.getEntriesByType('resource'))
+    .reduce((sum, e) => sum + (e.transferSize || 0), 0);
+"""
+
+@dataclass
+class LoadStats:
+    """Статистика відкриття сторінок для одного пулу/профілю."""
+    loads: int = 0
+    total_ms: float = 0.0
+    total_bytes: int = 0
+    peak_rss_mb: float = 0.0
+    last: dict = field(default_factory=dict)
+
+    def add(self, ms, transferred, rss_mb):
+        self.loads += 1
+        self.total_ms += ms
+        self.total_bytes += transferred
+        self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+        self.last = {"ms": ms, "bytes": transferred, "rss_mb": rss_mb}
+
+    def as_line(self) -> str:
+        if not self.loads:
+            return "no loads"
+        return (f"{self.loads} loads, avg {self.total_ms / self.loads:.0f} ms, "
+                f"avg {self.total_bytes / self.loads / 1024:.0f} KB, peak RSS {self.peak_rss_mb:.0f} MB")
+
+# --- Пул драйверів ---
+
+def _driver_pids(driver):
+    """PID браузера, chromedriver та всіх їхніх дочірніх процесів."""
+    roots = []
+    browser_pid = getattr(driver, "browser_pid", None)
+    if browser_pid:
+        roots.append(browser_pid)
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if process is not None and process.pid:
+        roots.append(process.pid)
+
+    pids = set()
+    for pid in roots:
+        try:
+            proc = psutil.Process(pid)
+            pids.add(pid)
+            pids.update(child.pid for child in proc.children(recursive=True))
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return pids
+
+def _rss_mb(pids):
+    total = 0
+    for pid in pids:
+        try:
+            total += psutil.Process(pid).memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total / (2**20)
+
+class PooledDriver:
+    """Драйвер з пулу разом з його віртуальним дисплеєм і лічильниками."""
+
+    def __init__(self, driver, display=None):
+        self.driver = driver
+        self.display = display
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+    def pids(self):
+        pids = _driver_pids(self.driver)
+        if self.display is not None and self.display.pid:
+            pids.add(self.display.pid)
+        return pids
+
+    def track(self, label):
+        process_registry.track(self.pids(), label, owner=self)
+
+    def close(self):
+        # знімаємо PID до quit, після нього дочірні процеси вже не знайти
+        self.track("closing")
+        try: self.driver.quit()
+        except Exception: pass
+        if self.display is not None:
+            try: self.display.stop()
+            except Exception: pass
+        # reap(self) шукає процеси за власником, тому release до нього не можна
+        process_registry.reap(self)
+
+class DriverPool:
+    """
+    Пул теплих Chrome драйверів з семантикою lease/return.
+
+    Драйвер перевикористовується між спробами і циклами оновлення.
+    Його перезапускають, якщо він не пройшов health-check, прожив довше
+    max_age секунд, обслужив max_uses lease-ів або процеси браузера
+    займають більше max_rss_mb.
+    """
+
+    def __init__(self, name, version_main=144, headless=False, use_display=False,
+                 max_size=1, max_uses=20, max_age=3600, max_rss_mb=700, profile="full"):
+        self.name = name
+        self.profile = LOAD_PROFILES[profile] if isinstance(profile, str) else profile
+        self.version_main = version_main
+        self.headless = headless
+        self.use_display = use_display
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.max_rss_mb = max_rss_mb
+
+        self._idle = []
+        self._leased = set()
+        self._starting = 0
+        self._cond = threading.Condition()
+        self.stats = LoadStats()
+
+    def _create(self):
+        display = None
+        if self.use_display:
+            from pyvirtualdisplay import Display
+            display = Display(visible=0, size=(1920, 1080))
+            display.start()
+        try:
+            driver = get_safe_driver(version_main=self.version_main, headless=self.headless,
+                                     profile=self.profile, cache_name=self.name)
+        except Exception:
+            if display is not None:
+                try: display.stop()
+                except Exception: pass
+            raise
+        logger.info(f"[DriverPool:{self.name}] Started new browser (profile '{self.profile.name}').")
+        entry = PooledDriver(driver, display)
+        entry.track(self.name)
+        return entry
+
+    def _is_healthy(self, entry):
+        try:
+            entry.driver.execute_script("return 1;")
+            return True
+        except Exception:
+            return False
+
+    def _recycle_reason(self, entry):
+        if entry.uses >= self.max_uses:
+            return "max uses"
+        if time.monotonic() - entry.created_at >= self.max_age:
+            return "max age"
+        rss = _rss_mb(entry.pids())
+        if rss >= self.max_rss_mb:
+            return f"memory {rss:.0f}MB"
+        return None
+
+    def _acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while not self._idle and len(self._leased) + self._starting >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"DriverPool '{self.name}' exhausted")
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    entry = self._idle.pop()
+                    self._leased.add(entry)
+                else:
+                    entry = None
+                    self._starting += 1
+
+            if entry is None:
+                try:
+                    entry = self._create()
+                finally:
+                    with self._cond:
+                        self._starting -= 1
+                        self._cond.notify()
+                with self._cond:
+                    self._leased.add(entry)
+                return entry
+
+            if self._is_healthy(entry):
+                return entry
+            logger.warning(f"[DriverPool:{self.name}] Browser failed health check, restarting.")
+            self._discard(entry)
+
+    def _discard(self, entry):
+        with self._cond:
+            self._leased.discard(entry)
+            self._cond.notify()
+        entry.close()
+
+    def _release(self, entry):
+        entry.uses += 1
+        reason = self._recycle_reason(entry)
+        if reason is None:
+            try:
+                # скидаємо стан, щоб наступний lease починав з чистої сторінки
+                entry.driver.switch_to.default_content()
+                entry.driver.get("about:blank")
+            except Exception:
+                reason = "reset failed"
+
+        if reason is not None:
+            logger.info(f"[DriverPool:{self.name}] Recycling browser ({reason}).")
+            self._discard(entry)
+            return
+
+        # браузер міг породити нові процеси (рендерери), дописуємо їх у реєстр
+        entry.track(self.name)
+        with self._cond:
+            self._leased.discard(entry)
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def load_page(self, driver, url):
+        """driver.get(url) із замірами: час, байти з мережі, RSS браузера."""
+        started = time.monotonic()
+        driver.get(url)
+        ms = (time.monotonic() - started) * 1000
+
+        try:
+            transferred = int(driver.execute_script(TRANSFER_SIZE_JS) or 0)
+        except Exception:
+            transferred = 0
+        with self._cond:
+            entry = next((e for e in self._leased if e.driver is driver), None)
+        rss = _rss_mb(entry.pids()) if entry else 0.0
+
+        self.stats.add(ms, transferred, rss)
+        logger.info(f"[DriverPool:{self.name}/{self.profile.name}] Loaded in {ms:.0f} ms, "
+                    f"{transferred / 1024:.0f} KB from network, browser RSS {rss:.0f} MB")
+
+    @contextmanager
+    def lease(self, timeout=300):
+        """Видає теплий драйвер. Якщо в блоці сталася помилка, драйвер знищується."""
+        entry = self._acquire(timeout)
+        try:
+            yield entry.driver
+        except BaseException:
+            self._discard(entry)
+            raise
+        else:
+            self._release(entry)
+
+    def shutdown(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            entry.close()
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_driver_pool(name, **kwargs):
+    """Повертає іменований пул, створюючи його при першому виклику з kwargs."""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = DriverPool(name, **kwargs)
+            _pools[name] = pool
+        return pool
+
+def driver_pool_stats():
+    """Рядки статистики завантаження сторінок по всіх пулах."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [f"{p.name} ({p.profile.name}): {p.stats.as_line()}" for p in pools]
+
+def shutdown_driver_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.shutdown()
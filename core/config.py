@@ -7,10 +7,62 @@ class Config:
     BOT_TOKEN = os.getenv("BOT_TOKEN")
     ADMIN_IDS = [int(id_str) for id_str in os.getenv("ADMIN_IDS", "").split(",") if id_str.strip()]
     DB_NAME = "bot_database.db"
+    # профіль SQLite (database/db.py): "fast" (WAL) або "default"
+    DB_PROFILE = os.getenv("DB_PROFILE", "fast")
+    DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    # скільки графіків (регіон, група, дата) тримати в пам'яті
+    SCHEDULE_CACHE_SIZE = int(os.getenv("SCHEDULE_CACHE_SIZE", "2000"))
+    # скільки днів тримати історію змін графіків (schedule_changes)
+    SCHEDULE_CHANGES_KEEP_DAYS = int(os.getenv("SCHEDULE_CHANGES_KEEP_DAYS", "30"))
     
     # профілі для селеніума
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     CHROME_PROFILE_PATH = os.path.join(BASE_DIR, "chrome_profile")
+    CHROME_DISK_CACHE_MB = int(os.getenv("CHROME_DISK_CACHE_MB", "100"))
     TESSERACT_CMD = "/usr/bin/tesseract"
 
+    # паралельне оновлення регіонів
+    REGION_UPDATE_CONCURRENCY = int(os.getenv("REGION_UPDATE_CONCURRENCY", "2"))
+    REGION_UPDATE_TIMEOUT = int(os.getenv("REGION_UPDATE_TIMEOUT", "900"))
+
+    # адаптивне опитування джерел, хвилини
+    POLL_MIN_INTERVAL = int(os.getenv("POLL_MIN_INTERVAL", "10"))
+    POLL_BASE_INTERVAL = int(os.getenv("POLL_BASE_INTERVAL", "30"))
+    POLL_MAX_INTERVAL = int(os.getenv("POLL_MAX_INTERVAL", "90"))
+    # вдень не рідше, ніж старий крон 0,30
+    POLL_DAY_MAX_INTERVAL = int(os.getenv("POLL_DAY_MAX_INTERVAL", "30"))
+    POLL_HISTORY_DAYS = 14
+
+    # процеси для CPU-важкого парсингу (OpenCV, OCR, lxml)
+    CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", "2"))
+    CPU_POOL_MAX_PENDING = int(os.getenv("CPU_POOL_MAX_PENDING", "8"))
+
+    # розсилки: Telegram дозволяє ~30 повідомлень/с і 1/с на чат
+    DELIVERY_RATE = float(os.getenv("DELIVERY_RATE", "25"))
+    DELIVERY_WORKERS = int(os.getenv("DELIVERY_WORKERS", "16"))
+    DELIVERY_PER_CHAT_INTERVAL = float(os.getenv("DELIVERY_PER_CHAT_INTERVAL", "1.0"))
+
+    # черга вихідних повідомлень (services/outbox.py)
+    OUTBOX_BATCH = int(os.getenv("OUTBOX_BATCH", "200"))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+    OUTBOX_RETRY_DELAY = int(os.getenv("OUTBOX_RETRY_DELAY", "60"))
+    OUTBOX_POLL_INTERVAL = 5
+    OUTBOX_REPORT_INTERVAL = 15
+    OUTBOX_KEEP_DAYS = 7
+    # скільки stop() чекає на поточну пачку, перш ніж перервати її
+    OUTBOX_STOP_TIMEOUT = 10
+
+    # час щоденного дайджесту, якщо користувач його не задавав
+    DIGEST_DEFAULT_TIME = os.getenv("DIGEST_DEFAULT_TIME", "08:00")
+
+    # попередження про відключення (services/alerts.py), хвилини до початку
+    ALERT_DEFAULT_LEAD = int(os.getenv("ALERT_DEFAULT_LEAD", "15"))
+    ALERT_LEAD_CHOICES = (5, 15, 30, 60)
+    # спізнились (перезапуск, сон ноутбука) не більше ніж на стільки секунд - ще надсилаємо
+    ALERT_GRACE_SECONDS = 120
+
+    # як довго фолбек Волині на останній URL картинки обходиться без браузера, сек
+    VOLYN_DISCOVERY_INTERVAL = int(os.getenv("VOLYN_DISCOVERY_INTERVAL", "3600"))
+
 config = Config()
\ No newline at end of file
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from core.config import config
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_semaphore = None
+
+def _warm_worker():
+    """Ініціалізатор процесу: заздалегідь вантажимо важкі модулі і OCR-рушій."""
+    import cv2, numpy, bs4, lxml.html  # noqa: F401
+    from regions.volyn import ocr
+    try:
+        ocr.get_engine()
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"[CpuPool] OCR warmup failed: {e}")
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: не копіюємо в дочірні процеси потоки і event loop бота
+            _executor = ProcessPoolExecutor(
+                max_workers=config.CPU_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+            logger.info(f"[CpuPool] Started {config.CPU_POOL_WORKERS} worker processes.")
+        return _executor
+
+def _reset_executor(broken):
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+async def run_cpu(func, *args):
+    """
+    Виконує CPU-важку функцію (парсинг, OCR) в окремому процесі, щоб вона
+    не конкурувала за GIL з event loop бота. Одночасно в черзі не більше
+    CPU_POOL_MAX_PENDING задач, решта чекає. func і аргументи мають
+    пікл-итися (функції рівня модуля).
+    """
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(config.CPU_POOL_MAX_PENDING)
+
+    loop = asyncio.get_running_loop()
+    async with _semaphore:
+        executor = _get_executor()
+        try:
+            return await loop.run_in_executor(executor, partial(func, *args))
+        except BrokenProcessPool:
+            # воркер впав (OOM, segfault в OpenCV) - перезапускаємо пул, задачу робимо в потоці
+            logger.error(f"[CpuPool] Pool broken while running {func.__name__}, restarting.")
+            _reset_executor(executor)
+            return await asyncio.to_thread(func, *args)
+
+def shutdown_cpu_pool():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,103 @@
+import os
+import signal
+import logging
+import threading
+import psutil
+
+logger = logging.getLogger(__name__)
+
+class _Tracked:
+    __slots__ = ("pid", "create_time", "pgid", "label", "owner")
+
+    def __init__(self, pid, create_time, pgid, label, owner):
+        self.pid = pid
+        self.create_time = create_time
+        self.pgid = pgid
+        self.label = label
+        self.owner = owner
+
+class ProcessRegistry:
+    """
+    Реєстр процесів, які запустив сам бот (браузери, chromedriver, Xvfb).
+
+    Замість перебору всіх процесів хоста прибирання працює тільки з
+    записаними PID та групами процесів. Процеси з живим власником
+    (драйвер у пулі) не чіпаються, поки власник не буде звільнений.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._procs = {}
+        self._own_pgid = os.getpgid(0)
+
+    def track(self, pids, label, owner=None):
+        """Записує процеси. Повторний виклик для того ж власника додає нових дочірніх."""
+        with self._lock:
+            for pid in pids:
+                if pid in self._procs:
+                    continue
+                try:
+                    proc = psutil.Process(pid)
+                    create_time = proc.create_time()
+                    pgid = os.getpgid(pid)
+                except (psutil.NoSuchProcess, psutil.AccessDenied, ProcessLookupError):
+                    continue
+                # спільну з ботом групу вбивати не можна
+                if pgid == self._own_pgid:
+                    pgid = None
+                self._procs[pid] = _Tracked(pid, create_time, pgid, label, owner)
+
+    def release(self, owner):
+        """Власник завершився: його процеси стають кандидатами на прибирання."""
+        with self._lock:
+            for item in self._procs.values():
+                if item.owner is owner:
+                    item.owner = None
+
+    def reap(self, owner=None) -> int:
+        """
+        Вбиває звільнені процеси (або лише процеси owner, якщо його вказано)
+        разом з їхніми групами. Повертає кількість вбитих процесів.
+        """
+        with self._lock:
+            if owner is not None:
+                targets = [p for p in self._procs.values() if p.owner is owner]
+            else:
+                targets = [p for p in self._procs.values() if p.owner is None]
+            for item in targets:
+                del self._procs[item.pid]
+
+        killed = 0
+        groups = set()
+        for item in targets:
+            try:
+                proc = psutil.Process(item.pid)
+                # PID міг бути перевикористаний іншим процесом
+                if proc.create_time() != item.create_time:
+                    continue
+                proc.kill()
+                killed += 1
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+            if item.pgid is not None:
+                groups.add(item.pgid)
+
+        # chrome і Xvfb не створюють нову сесію: їхня група часто і є групою бота
+        own_pgid = os.getpgid(0)
+        for pgid in groups:
+            if pgid == own_pgid:
+                continue
+            try:
+                os.killpg(pgid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+        if killed:
+            logger.info(f"[Processes] Reaped {killed} owned processes.")
+        return killed
+
+    def tracked_count(self) -> int:
+        with self._lock:
+            return len(self._procs)
+
+process_registry = ProcessRegistry()
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="region")
+    return _executor
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = 3
+    base_delay: float = 10.0      # пауза перед другою спробою, сек
+    max_delay: float = 300.0
+    factor: float = 2.0
+    jitter: float = 0.2           # ±20% від паузи
+    budget: int = 12              # не більше спроб на джерело за budget_window
+    budget_window: float = 3600.0
+
+    def delay(self, attempt: int) -> float:
+        """Пауза після невдалої спроби номер attempt (з 1)."""
+        delay = min(self.max_delay, self.base_delay * self.factor ** (attempt - 1))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+class RetryScheduler:
+    """
+    Спільний asyncio-планувальник повторних спроб для воркерів регіонів.
+
+    Кожна спроба - блокуюча функція, яка виконується в потоці через
+    asyncio.to_thread. Паузи між спробами - asyncio.sleep, тож джерело,
+    що чекає, не тримає жодного потоку. Новий запуск для того ж джерела
+    перехоплює старий, якщо той саме чекає паузу: старий виклик повертає None.
+
+    Скасування корутини не зупиняє потік, тому потоки рахуються по джерелу,
+    доки справді не завершаться (busy/wait_idle), а cancel() піднімає
+    прапорець, який блокуюча функція перевіряє між кроками.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self._backing_off = set()
+        self._attempts = {}
+        self._threads = Counter()
+        self._idle_waiters = {}
+        self._cancel = {}
+
+    def is_backing_off(self, source: str) -> bool:
+        return source in self._backing_off
+
+    def _cancel_event(self, source) -> threading.Event:
+        event = self._cancel.get(source)
+        if event is None:
+            event = self._cancel[source] = threading.Event()
+        return event
+
+    def cancel(self, source: str):
+        """Просить потоки джерела завершитись якнайшвидше (таймаут регіону)."""
+        self._cancel_event(source).set()
+
+    def reset(self, source: str):
+        self._cancel_event(source).clear()
+
+    def cancel_requested(self, source: str) -> bool:
+        return self._cancel_event(source).is_set()
+
+    def sleep(self, source: str, seconds: float) -> bool:
+        """time.sleep для потоку воркера, що перериваються cancel(). True - скасовано."""
+        return self._cancel_event(source).wait(seconds)
+
+    def busy(self, source: str) -> bool:
+        """Чи живий ще хоч один потік джерела."""
+        return self._threads[source] > 0
+
+    async def wait_idle(self, source: str):
+        if not self.busy(source):
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._idle_waiters.setdefault(source, []).append(waiter)
+        await waiter
+
+    def _thread_done(self, source):
+        self._threads[source] -= 1
+        if self._threads[source] > 0:
+            return
+        del self._threads[source]
+        for waiter in self._idle_waiters.pop(source, []):
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _notify_done(self, loop, source):
+        try:
+            loop.call_soon_threadsafe(self._thread_done, source)
+        except RuntimeError:
+            # loop вже закритий - бот зупиняється, рахувати нікому
+            pass
+
+    async def to_thread(self, source: str, func, *args):
+        """Як asyncio.to_thread, але потік лічиться за source до свого фактичного завершення."""
+        loop = asyncio.get_running_loop()
+        self._threads[source] += 1
+        future = _get_executor().submit(func, *args)
+        # спрацьовує і після завершення, і якщо задачу скасували до старту
+        future.add_done_callback(lambda _: self._notify_done(loop, source))
+        return await asyncio.wrap_future(future)
+
+    def _take_budget(self, source, policy) -> bool:
+        history = self._attempts.setdefault(source, deque())
+        now = time.monotonic()
+        while history and now - history[0] > policy.budget_window:
+            history.popleft()
+        if len(history) >= policy.budget:
+            return False
+        history.append(now)
+        return True
+
+    async def _run(self, source, func, policy, args):
+        for attempt in range(1, policy.attempts + 1):
+            if self.cancel_requested(source):
+                return None
+            if not self._take_budget(source, policy):
+                logger.error(f"[Retry:{source}] Attempt budget exhausted ({policy.budget}/{policy.budget_window:.0f}s).")
+                return None
+
+            logger.info(f"[Retry:{source}] Attempt #{attempt} of {policy.attempts}...")
+            result = await self.to_thread(source, func, *args)
+            if result:
+                return result
+
+            if attempt < policy.attempts:
+                delay = policy.delay(attempt)
+                logger.warning(f"[Retry:{source}] Failed. Waiting {delay:.0f}s before retry...")
+                self._backing_off.add(source)
+                try:
+                    await asyncio.sleep(delay)
+                finally:
+                    self._backing_off.discard(source)
+
+        logger.error(f"[Retry:{source}] All {policy.attempts} attempts failed.")
+        return None
+
+    async def run(self, source: str, func, policy: RetryPolicy, *args):
+        """Виконує func(*args) до першого truthy результату. None, якщо не вдалося."""
+        previous = self._tasks.get(source)
+        if previous and not previous.done():
+            if self.is_backing_off(source):
+                logger.info(f"[Retry:{source}] Taking over from a run waiting for retry.")
+                previous.cancel()
+            else:
+                # спроба вже йде: чекаємо її результат замість дубля
+                try:
+                    return await asyncio.shield(previous)
+                except asyncio.CancelledError:
+                    if asyncio.current_task().cancelling():
+                        raise
+                    return None
+
+        task = asyncio.create_task(self._run(source, func, policy, args))
+        self._tasks[source] = task
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                # скасували нас (таймаут регіону, зупинка бота) - скасовуємо і спроби
+                task.cancel()
+                raise
+            # нас перехопив новіший запуск
+            return None
+        finally:
+            if self._tasks.get(source) is task:
+                del self._tasks[source]
+
+retry_scheduler = RetryScheduler()
@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+
+# Доба = 48 слотів по 30 хв, слот i - біт i (00:00 -> біт 0)
+SLOTS = 48
+FULL_MASK = (1 << SLOTS) - 1
+
+def slot_bit(slot: int) -> int:
+    return 1 << slot
+
+@dataclass(frozen=True, slots=True)
+class DayMask:
+    """
+    Графік на добу у двох 48-бітних масках: off (світла немає) і unknown
+    (статус невідомий). Решта слотів - "on".
+    """
+    off: int = 0
+    unknown: int = 0
+
+    @classmethod
+    def from_list(cls, hours: list[str]) -> "DayMask":
+        """['on', 'off', ...] з 48 (або 24 погодинних) значень -> маски."""
+        if len(hours) == 24:
+            hours = [status for status in hours for _ in range(2)]
+        off = unknown = 0
+        for i, status in enumerate(hours[:SLOTS]):
+            if status == "off":
+                off |= 1 << i
+            elif status != "on":
+                unknown |= 1 << i
+        return cls(off, unknown)
+
+    def to_list(self) -> list[str]:
+        return [self.status(i) for i in range(SLOTS)]
+
+    @property
+    def on(self) -> int:
+        return FULL_MASK & ~(self.off | self.unknown)
+
+    def status(self, slot: int) -> str:
+        bit = 1 << slot
+        if self.off & bit:
+            return "off"
+        if self.unknown & bit:
+            return "unknown"
+        return "on"
+
+    def is_off(self, slot: int) -> bool:
+        return bool(self.off >> slot & 1)
+
+    def is_on(self, slot: int) -> bool:
+        return bool(self.on >> slot & 1)
+
+    @property
+    def off_hours(self) -> float:
+        return self.off.bit_count() / 2
+
+    def changed_slots(self, other: "DayMask") -> int:
+        """Маска слотів, статус яких відрізняється від other."""
+        return (self.off ^ other.off) | (self.unknown ^ other.unknown)
+
+    def off_intervals(self) -> list[tuple[int, int]]:
+        """Безперервні відключення як пари слотів [start, end)."""
+        intervals = []
+        mask = self.off
+        while mask:
+            start = (mask & -mask).bit_length() - 1
+            # кількість одиниць підряд, починаючи зі start
+            run = (~(mask >> start) & ((mask >> start) + 1)).bit_length() - 1
+            intervals.append((start, start + run))
+            mask &= ~(((1 << run) - 1) << start)
+        return intervals
+
+def encode(hours: list[str]) -> tuple[int, int]:
+    mask = DayMask.from_list(hours)
+    return mask.off, mask.unknown
+
+def decode(off: int | None, unknown: int | None) -> DayMask:
+    return DayMask(off or 0, unknown or 0)
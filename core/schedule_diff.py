@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+
+from core.schedule_bits import SLOTS, DayMask
+
+Interval = tuple[int, int]   # слоти [start, end)
+
+def format_slot(slot: int) -> str:
+    return f"{slot // 2:02d}:{30 * (slot % 2):02d}" if slot < SLOTS else "24:00"
+
+def format_interval(interval: Interval) -> str:
+    return f"{format_slot(interval[0])}–{format_slot(interval[1])}"
+
+def format_intervals(intervals) -> str:
+    return ", ".join(format_interval(i) for i in intervals)
+
+@dataclass(frozen=True, slots=True)
+class ScheduleDiff:
+    """
+    Зміна відключень групи на дату на рівні інтервалів. Хешується, тож
+    однакові зміни різних груп рендеряться один раз.
+    """
+    date: str
+    added: tuple[Interval, ...] = ()
+    removed: tuple[Interval, ...] = ()
+    # (було, стало): групи інтервалів, що перетинаються; розбиття чи злиття
+    # відключення - одна зміна з кількома інтервалами з одного боку
+    shifted: tuple[tuple[tuple[Interval, ...], tuple[Interval, ...]], ...] = ()
+    off_before: int = 0          # слотів без світла до і після
+    off_after: int = 0
+    is_new: bool = False         # на цю дату графіка ще не було
+
+    @property
+    def is_noop(self) -> bool:
+        """Відключення не змінились (напр. змінились лише невідомі слоти)."""
+        return not (self.is_new or self.added or self.removed or self.shifted)
+
+    def summary(self) -> str:
+        lines = []   # (слот для сортування, рядок)
+        for old, new in self.shifted:
+            lines.append((new[0][0], f"↔️ {format_intervals(old)} → {format_intervals(new)}"))
+        for interval in self.added:
+            lines.append((interval[0], f"➕ Нове відключення {format_interval(interval)}"))
+        for interval in self.removed:
+            lines.append((interval[0], f"➖ Скасовано {format_interval(interval)}"))
+        lines = [line for _, line in sorted(lines)]
+        if self.off_before != self.off_after:
+            lines.append(f"⏱ Без світла: {self.off_before / 2:g} → {self.off_after / 2:g} год")
+        return "\n".join(lines)
+
+def _overlaps(a: Interval, b: Interval) -> bool:
+    return a[0] < b[1] and b[0] < a[1]
+
+def diff_masks(date: str, old: DayMask | None, new: DayMask) -> ScheduleDiff:
+    """Додані, скасовані і зсунуті (перетинаються зі старими) інтервали відключень."""
+    new_intervals = new.off_intervals()
+    if old is None:
+        return ScheduleDiff(date, added=tuple(new_intervals), off_after=new.off.bit_count(), is_new=True)
+    if old.off == new.off:
+        return ScheduleDiff(date, off_before=old.off.bit_count(), off_after=new.off.bit_count())
+
+    old_intervals = old.off_intervals()
+    old_left = [i for i in old_intervals if i not in new_intervals]
+    new_left = [i for i in new_intervals if i not in old_intervals]
+    # компоненти зв'язності графа перетинів старих і нових інтервалів
+    shifted = []
+    for seed in list(old_left):
+        if seed not in old_left:
+            continue
+        old_group, new_group = [seed], []
+        old_left.remove(seed)
+        changed = True
+        while changed:
+            changed = False
+            for i in [i for i in new_left if any(_overlaps(i, o) for o in old_group)]:
+                new_group.append(i)
+                new_left.remove(i)
+                changed = True
+            for o in [o for o in old_left if any(_overlaps(o, i) for i in new_group)]:
+                old_group.append(o)
+                old_left.remove(o)
+                changed = True
+        if new_group:
+            shifted.append((tuple(sorted(old_group)), tuple(sorted(new_group))))
+        else:
+            # без нових інтервалів поруч - просто скасоване відключення
+            old_left.append(seed)
+    old_left.sort()
+    return ScheduleDiff(date, added=tuple(new_left), removed=tuple(old_left), shifted=tuple(shifted),
+                        off_before=old.off.bit_count(), off_after=new.off.bit_count())
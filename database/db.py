@@ -1,15 +1,110 @@
+import json
+import logging
+from sqlalchemy import event, inspect, text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from core.config import config
+from core.schedule_bits import encode
 from database.models import Base
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = f"sqlite+aiosqlite:///{config.DB_NAME}"
 
-engine = create_async_engine(DATABASE_URL, echo=False)
+# Профілі SQLite. PRAGMA виконуються на кожному новому з'єднанні пулу.
+# fast: WAL дозволяє читати під час запису скрапера, synchronous=NORMAL
+# у WAL не втрачає цілісність (лише останню транзакцію при збої живлення).
+SQLITE_PROFILES = {
+    "default": {},
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 64 * 2**20,
+        "cache_size": -16000,      # від'ємне значення - у KiB, тобто ~16 МБ
+        "temp_store": "MEMORY",
+    },
+}
+
+def make_engine(url=DATABASE_URL, profile=None, busy_timeout_ms=None):
+    """Async engine з PRAGMA профілю, busy_timeout і пулом під aiosqlite."""
+    profile = profile or config.DB_PROFILE
+    pragmas = dict(SQLITE_PROFILES[profile])
+    # скільки чекати зайнятої бази замість "database is locked"
+    pragmas["busy_timeout"] = config.DB_BUSY_TIMEOUT_MS if busy_timeout_ms is None else busy_timeout_ms
+
+    new_engine = create_async_engine(
+        url,
+        echo=False,
+        # кожне з'єднання aiosqlite - окремий потік, тож тримаємо їх небагато і теплими
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_POOL_SIZE,
+        pool_timeout=30,
+        connect_args={"timeout": pragmas["busy_timeout"] / 1000},
+    )
+
+    @event.listens_for(new_engine.sync_engine, "connect")
+    def _apply_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return new_engine
+
+engine = make_engine()
 async_session = async_sessionmaker(engine, expire_on_commit=False)
 
+def _add_missing_columns(sync_conn):
+    """create_all не змінює існуючі таблиці, тому нові колонки моделей додаємо через ALTER TABLE."""
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            col_type = column.type.compile(dialect=sync_conn.dialect)
+            sync_conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"))
+
+def _migrate_schedule_masks(sync_conn):
+    """Старі графіки (JSON у schedules.hours_data) переводимо в off/unknown маски і прибираємо колонку."""
+    columns = {col["name"] for col in inspect(sync_conn).get_columns("schedules")}
+    if "hours_data" not in columns:
+        return
+
+    rows = sync_conn.execute(text(
+        "SELECT date, region, group_code, hours_data FROM schedules WHERE hours_data IS NOT NULL"
+    )).all()
+    params = []
+    for date, region, group_code, hours_data in rows:
+        try:
+            off, unknown = encode(json.loads(hours_data))
+        except (TypeError, ValueError):
+            off, unknown = 0, (1 << 48) - 1
+        params.append({"d": date, "r": region, "g": group_code, "off": off, "unk": unknown})
+    if params:
+        sync_conn.execute(text(
+            "UPDATE schedules SET off_mask = :off, unknown_mask = :unk "
+            "WHERE date = :d AND region = :r AND group_code = :g"
+        ), params)
+
+    try:
+        sync_conn.execute(text("ALTER TABLE schedules DROP COLUMN hours_data"))
+    except Exception as e:
+        # SQLite < 3.35 не вміє DROP COLUMN - просто звільняємо місце
+        logger.warning(f"[DB] Can't drop schedules.hours_data ({e}), clearing it instead.")
+        sync_conn.execute(text("UPDATE schedules SET hours_data = NULL"))
+    logger.info(f"[DB] Migrated {len(params)} schedules to bit masks.")
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_migrate_schedule_masks)
+        journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+    logger.info(f"[DB] SQLite profile '{config.DB_PROFILE}', journal_mode={journal_mode}")
 
 def get_session():
     return async_session()
\ No newline at end of file
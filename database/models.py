@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, BigInteger, PrimaryKeyConstraint
+from sqlalchemy import Column, Integer, String, Text, DateTime, BigInteger, Index, PrimaryKeyConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.sql import func
 
@@ -16,6 +16,8 @@ class User(Base):
     group_number = Column(String, nullable=True)
     alert_time = Column(String, default="08:00")
     notification_mode = Column(String, default="no_night")
+    # за скільки хвилин до відключення попереджати (NULL - config.ALERT_DEFAULT_LEAD)
+    alert_lead_minutes = Column(Integer, nullable=True)
 
 class Schedule(Base):
     __tablename__ = "schedules"
@@ -25,11 +27,96 @@ class Schedule(Base):
     region = Column(String, primary_key=True)    # lviv або volyn
     group_code = Column(String, primary_key=True) # 1.1, 2.2 і т.д.
     
-    hours_data = Column(Text)                    # JSON рядок зі списком [on, off, ...]
+    # 48 слотів по 30 хв бітовими масками (core/schedule_bits.py): біт i - слот i
+    off_mask = Column(BigInteger, nullable=False, default=0)
+    unknown_mask = Column(BigInteger, nullable=False, default=0)
     site_updated_at = Column(String, nullable=True) # Час з сайту (напр. 11:11)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     # Ми явно вказуємо PrimaryKeyConstraint, щоб SQLAlchemy не лаялась
     __table_args__ = (
         PrimaryKeyConstraint('date', 'region', 'group_code'),
-    )
\ No newline at end of file
+    )
+
+class ScheduleChange(Base):
+    __tablename__ = "schedule_changes"
+
+    # Кожна реальна зміна графіка групи: маски до і після (old_* NULL - графік з'явився вперше)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    date = Column(String, index=True)
+    region = Column(String)
+    group_code = Column(String)
+    old_off = Column(BigInteger, nullable=True)
+    old_unknown = Column(BigInteger, nullable=True)
+    new_off = Column(BigInteger, nullable=False)
+    new_unknown = Column(BigInteger, nullable=False)
+    changed_at = Column(DateTime, server_default=func.now())  # UTC
+
+class SourceState(Base):
+    __tablename__ = "source_state"
+
+    # Останній оброблений контент джерела (картинка, сторінка) по регіону
+    region = Column(String, primary_key=True)
+    source_url = Column(String, nullable=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_hash = Column(String, nullable=True)   # sha256 від байтів контенту
+    content_date = Column(String, nullable=True)   # дата графіка, розпізнана з контенту
+    processed_date = Column(String, nullable=True) # дата (Київ) останньої повної обробки
+    process_ms = Column(Integer, nullable=True)    # скільки тривала повна обробка
+    # сесія останнього пошуку в браузері, для швидкого шляху без Selenium
+    cookies = Column(Text, nullable=True)          # JSON {name: value}
+    user_agent = Column(String, nullable=True)
+    discovered_at = Column(DateTime, nullable=True)
+    checked_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class SourceChange(Base):
+    __tablename__ = "source_changes"
+
+    # Історія реальних змін графіка по регіону, з неї вчиться адаптивне опитування
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    region = Column(String, index=True)
+    changed_at = Column(DateTime, server_default=func.now())  # UTC
+
+class OutboxJob(Base):
+    __tablename__ = "outbox_jobs"
+
+    # Одна розсилка (зміна графіка, оголошення адміна)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    label = Column(String)
+    text = Column(Text, nullable=True)             # спільний текст, якщо в рядках outbox його немає
+    parse_mode = Column(String, nullable=True)
+    total = Column(Integer, default=0)
+    report_chat_id = Column(BigInteger, nullable=True)     # куди звітувати про прогрес
+    report_message_id = Column(BigInteger, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())  # UTC
+    finished_at = Column(DateTime, nullable=True)
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox"
+
+    # Одне повідомлення одному отримувачу.
+    # status: pending -> sending -> sent | blocked | failed | interrupted
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(Integer, index=True)
+    chat_id = Column(BigInteger)
+    text = Column(Text, nullable=True)
+    status = Column(String, default="pending")
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, nullable=True)  # UTC, None - одразу
+
+    __table_args__ = (
+        Index("ix_outbox_status_next", "status", "next_attempt_at"),
+    )
+
+class DeferredMessage(Base):
+    __tablename__ = "deferred"
+
+    # Те, що користувач "no_night" пропустив уночі; не більше одного рядка на (user, region, group),
+    # о 07:00 надсилається актуальний стан графіка
+    user_id = Column(BigInteger, primary_key=True)
+    region = Column(String, primary_key=True)
+    group_code = Column(String, primary_key=True)
+    kind = Column(String, default="changes")   # changes | digest
+    queued_at = Column(DateTime)               # UTC, останнє оновлення
@@ -0,0 +1,214 @@
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import pytz
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.sql import func
+
+import database.db as db
+from core.config import config
+from core.schedule_bits import DayMask, decode
+from core.schedule_diff import ScheduleDiff, diff_masks
+from database.models import Schedule, ScheduleChange
+
+logger = logging.getLogger(__name__)
+KYIV_TZ = pytz.timezone('Europe/Kyiv')
+
+class ScheduleCache:
+    """
+    Спільний кеш графіків (region, group, date) -> {'mask', 'updated_at'} або None.
+
+    Графіки міняються кілька разів на добу і пишуться лише через
+    save_schedules, яка оновлює кеш, тож читання - це пошук у словнику.
+    LRU з обмеженим розміром; записи за минулі дати викидаються.
+
+    Промах читає БД з await, і за цей час save_schedules може покласти
+    новіше значення. Тому кожен запис від save_schedules отримує номер
+    покоління, а прочитане з БД кладеться лише через put_if_unchanged.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._today = None
+        self.generation = 0
+        self._saved_at = {}   # key -> покоління останнього запису з save_schedules
+
+    def get(self, key):
+        """(True, значення) або (False, None), якщо ключа немає."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return False, None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def put(self, key, value):
+        """Свіже значення з save_schedules."""
+        self.generation += 1
+        self._saved_at[key] = self.generation
+        self._store(key, value)
+
+    def put_if_unchanged(self, key, value, generation):
+        """Значення, прочитане з БД при поколінні generation; ігнорується, якщо ключ відтоді зберігали."""
+        if self._saved_at.get(key, 0) > generation:
+            return
+        self._store(key, value)
+
+    def _store(self, key, value):
+        self._evict_past_dates()
+        if key[2] < self._today:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def _evict_past_dates(self):
+        today = datetime.now(KYIV_TZ).strftime("%Y-%m-%d")
+        if today == self._today:
+            return
+        self._today = today
+        for key in [k for k in self._data if k[2] < today]:
+            del self._data[key]
+        for key in [k for k in self._saved_at if k[2] < today]:
+            del self._saved_at[key]
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        ratio = self.hits / total * 100 if total else 0
+        return f"{len(self._data)} entries, hits {self.hits}, misses {self.misses} ({ratio:.0f}% hit)"
+
+schedule_cache = ScheduleCache(config.SCHEDULE_CACHE_SIZE)
+
+async def get_schedule(region: str, group: str, date: str) -> dict | None:
+    """Графік групи на дату через кеш: {'mask': DayMask, 'updated_at': '12:00'} або None."""
+    key = (region, group, date)
+    found, value = schedule_cache.get(key)
+    if found:
+        return value
+
+    generation = schedule_cache.generation
+    async with db.get_session() as session:
+        result = await session.execute(
+            select(Schedule.off_mask, Schedule.unknown_mask, Schedule.site_updated_at).where(
+                Schedule.region == region,
+                Schedule.group_code == group,
+                Schedule.date == date,
+            )
+        )
+        row = result.one_or_none()
+
+    value = None
+    if row:
+        value = {"mask": decode(row.off_mask, row.unknown_mask), "updated_at": row.site_updated_at}
+    schedule_cache.put_if_unchanged(key, value, generation)
+    return value
+
+# Підписники на зміни графіків: func(region, date, {group: DayMask}) після коміту
+_save_listeners = []
+
+def add_save_listener(func):
+    """Реєструє синхронний обробник змінених графіків (індекси, кеші сервісів)."""
+    _save_listeners.append(func)
+
+async def load_day_masks(date: str) -> dict[tuple[str, str], DayMask]:
+    """Маски всіх регіонів і груп на дату одним запитом: {(region, group): DayMask}."""
+    async with db.get_session() as session:
+        result = await session.execute(
+            select(Schedule.region, Schedule.group_code, Schedule.off_mask, Schedule.unknown_mask)
+            .where(Schedule.date == date)
+        )
+        return {(region, group): decode(off, unknown) for region, group, off, unknown in result}
+
+async def save_schedules(region: str, date: str, groups: dict[str, list],
+                         site_updated_at: str | None) -> dict[str, ScheduleDiff]:
+    """
+    Зберігає графіки всіх груп регіону на дату і повертає {group: ScheduleDiff}
+    для груп, у яких змінились відключення.
+
+    Один SELECT на всі наявні рядки (region, date), порівняння в пам'яті
+    і один пакетний INSERT ... ON CONFLICT DO UPDATE для змінених груп.
+    Кожна зміна масок пишеться в schedule_changes ще одним пакетним INSERT;
+    зміни лише невідомих слотів зберігаються, але не повертаються
+    (сповіщати нема про що).
+    """
+    async with db.get_session() as session:
+        result = await session.execute(
+            select(Schedule.group_code, Schedule.off_mask, Schedule.unknown_mask).where(
+                Schedule.region == region,
+                Schedule.date == date,
+            )
+        )
+        existing = {group_code: decode(off, unknown) for group_code, off, unknown in result}
+
+        masks = {group: DayMask.from_list(hours) for group, hours in groups.items()}
+        changed = [group for group, mask in masks.items() if existing.get(group) != mask]
+        if not changed:
+            return {}
+
+        stmt = insert(Schedule).values([
+            {
+                "date": date,
+                "region": region,
+                "group_code": group,
+                "off_mask": masks[group].off,
+                "unknown_mask": masks[group].unknown,
+                "site_updated_at": site_updated_at,
+            }
+            for group in changed
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Schedule.date, Schedule.region, Schedule.group_code],
+            set_={
+                "off_mask": stmt.excluded.off_mask,
+                "unknown_mask": stmt.excluded.unknown_mask,
+                "site_updated_at": stmt.excluded.site_updated_at,
+                "updated_at": func.now(),
+            },
+        )
+        await session.execute(stmt)
+        # старі зміни чистить prune_schedule_changes у нічному бекапі, не тут
+        await session.execute(insert(ScheduleChange).values([
+            {
+                "date": date,
+                "region": region,
+                "group_code": group,
+                "old_off": existing[group].off if group in existing else None,
+                "old_unknown": existing[group].unknown if group in existing else None,
+                "new_off": masks[group].off,
+                "new_unknown": masks[group].unknown,
+            }
+            for group in changed
+        ]))
+        await session.commit()
+
+    for group in changed:
+        schedule_cache.put((region, group, date), {"mask": masks[group], "updated_at": site_updated_at})
+
+    changed_masks = {group: masks[group] for group in changed}
+    for listener in _save_listeners:
+        try:
+            listener(region, date, changed_masks)
+        except Exception as e:
+            logger.error(f"[Schedules] Save listener {listener.__name__} failed: {e}")
+
+    diffs = {group: diff_masks(date, existing.get(group), masks[group]) for group in changed}
+    diffs = {group: diff for group, diff in diffs.items() if not diff.is_noop}
+    logger.info(f"[Schedules] {region} {date}: saved {len(changed)} of {len(groups)} groups, "
+                f"{len(diffs)} with outage changes.")
+    return diffs
+
+async def prune_schedule_changes() -> int:
+    """Видаляє історію змін, старшу за SCHEDULE_CHANGES_KEEP_DAYS. Викликається раз на добу."""
+    cutoff = (datetime.now(KYIV_TZ) - timedelta(days=config.SCHEDULE_CHANGES_KEEP_DAYS)).strftime("%Y-%m-%d")
+    async with db.get_session() as session:
+        result = await session.execute(ScheduleChange.__table__.delete().where(ScheduleChange.date < cutoff))
+        await session.commit()
+    return result.rowcount
@@ -0,0 +1,20 @@
+from sqlalchemy.sql import func
+
+import database.db as db
+from database.models import SourceState
+
+async def get_source_state(region: str) -> SourceState | None:
+    async with db.get_session() as session:
+        return await session.get(SourceState, region)
+
+async def save_source_state(region: str, **fields):
+    """Оновлює (або створює) стан джерела регіону. Передані поля перезаписуються."""
+    async with db.get_session() as session:
+        state = await session.get(SourceState, region)
+        if state is None:
+            state = SourceState(region=region)
+            session.add(state)
+        for key, value in fields.items():
+            setattr(state, key, value)
+        state.checked_at = func.now()
+        await session.commit()
@@ -5,15 +5,18 @@ from aiogram import Router, types, F
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.utils.keyboard import ReplyKeyboardBuilder
-from sqlalchemy import select
 
+from core.browser import driver_pool_stats
 from core.config import config
-import database.db as db
-from database.models import User
+from database.schedules import schedule_cache
 from handlers.states import AdminState
 from regions.registry import get_active_regions_list
 from services.broadcaster import notify_changes
-from core.browser import kill_zombie_processes, clean_temp_files
+from services.delivery import Outgoing
+from services.outbox import outbox
+from services.polling import adaptive_poller
+from services.subscribers import subscriber_index
+from services.scheduler import run_region_updates
 
 router = Router()
 
@@ -24,18 +27,20 @@ def is_admin(user_id: int) -> bool:
 async def cmd_admin(message: types.Message):
     if not is_admin(message.from_user.id): return
 
-    async with db.get_session() as session:
-        result = await session.execute(select(User))
-        users_count = len(result.scalars().all())
+    users_count = subscriber_index.count()
 
     builder = ReplyKeyboardBuilder()
     builder.button(text="Оновити базу")
     builder.button(text="Розсилка")
     builder.button(text="🔄 Перезапустити бота")
     builder.adjust(2, 1)
+
+    pool_lines = driver_pool_stats()
+    browsers = ("\n🌐 Браузери:\n" + "\n".join(pool_lines)) if pool_lines else ""
     
     await message.answer(
-        f"⚙️ **Адмін-панель**\n👤 Користувачів у базі: {users_count}", 
+        f"⚙️ **Адмін-панель**\n👤 Користувачів у базі: {users_count}\n"
+        f"🗂 Кеш графіків: {schedule_cache.stats()}{browsers}", 
         reply_markup=builder.as_markup(resize_keyboard=True),
         parse_mode="Markdown"
     )
@@ -57,34 +62,15 @@ async def admin_force_update(message: types.Message):
 
     await message.answer("Починаю повне оновлення (це займе час)...")
     
-    report = []
-    regions = get_active_regions_list()
-    
-    for region in regions:
-        kill_zombie_processes()
-        clean_temp_files()
-        
-        try:
-            await message.answer(f"🔄 Оновлюю: {region.name}...")
-            changes = await region.update_data()
-            
-            status = f"✅ {region.name}: "
-            if changes:
-                status += f"ЗМІНИ! ({len(changes)} груп)"
-                await notify_changes(message.bot, region.code, changes)
-            else:
-                status += "Без змін"
-            
-            report.append(status)
-            
-        except Exception as e:
-            report.append(f"❌ {region.name}: Помилка ({e})")
-        
-        await asyncio.sleep(2)
-    
-    kill_zombie_processes()
+    async def on_changes(region_code, changes):
+        await notify_changes(message.bot, region_code, changes)
+
+    results = await run_region_updates(get_active_regions_list(), on_changes=on_changes)
+    # ручні оновлення теж вчать адаптивне опитування
+    await adaptive_poller.record(results)
     
-    await message.answer("\n".join(report))
+    # у тексті помилок можуть бути "_" і "*" - без Markdown
+    await message.answer("\n".join(r.as_line() for r in results), parse_mode=None)
 
 # broadcast message
 @router.message(F.text == "Розсилка")
@@ -101,23 +87,19 @@ async def cancel_broadcast(message: types.Message, state: FSMContext):
 @router.message(AdminState.waiting_for_broadcast)
 async def admin_broadcast_send(message: types.Message, state: FSMContext):
     text = message.text
-    bot = message.bot
     
-    async with db.get_session() as session:
-        result = await session.execute(select(User))
-        users = result.scalars().all()
+    user_ids = subscriber_index.all_user_ids()
     
-    count = 0
-    await message.answer(f"Починаю розсилку на {len(users)} юзерів...")
-    
-    for user in users:
-        try:
-            await bot.send_message(user.user_id, f"📢 **ОГОЛОШЕННЯ**\n\n{text}", parse_mode="Markdown")
-            count += 1
-            await asyncio.sleep(0.05)
-        except Exception:
-            pass
-            
-    await message.answer(f"Успішно: {count} з {len(users)}")
+    # це повідомлення дренер черги редагуватиме з прогресом
+    progress = await message.answer(f"📤 Розсилка на {len(user_ids)} юзерів: в черзі...", parse_mode=None)
+    await outbox.enqueue(
+        "broadcast",
+        [Outgoing(user_id, None) for user_id in user_ids],
+        text=f"📢 **ОГОЛОШЕННЯ**\n\n{text}",
+        parse_mode="Markdown",
+        report_chat_id=progress.chat.id,
+        report_message_id=progress.message_id,
+    )
+
     await state.clear()
     await cmd_admin(message)
\ No newline at end of file
@@ -1,65 +1,53 @@
 import logging
-import json
 from aiogram import Router, types, F
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from datetime import datetime, timedelta
 import pytz
-from sqlalchemy import select
 
 import database.db as db
-from database.models import User, Schedule
+from core.schedule_bits import DayMask
+from database.models import User
 from regions.registry import get_region
 
 router = Router()
 KYIV_TZ = pytz.timezone('Europe/Kyiv')
 logger = logging.getLogger(__name__)
 
-def format_day_block(date_title, schedule_list, update_time=None):
+def format_day_block(date_title, schedule, update_time=None):
+    """schedule - DayMask (або старий список ['on', 'off', ...])."""
 
-    if not schedule_list:
+    if not schedule:
         return f"📅 {date_title}\n⚪ Дані відсутні.\n"
 
-    if len(schedule_list) == 24:
-        extended_list = []
-        for status in schedule_list:
-            extended_list.extend([status, status])
-        schedule_list = extended_list
-    off_slots = schedule_list.count('off')
-    total_off_hours = off_slots * 0.5
+    if not isinstance(schedule, DayMask):
+        schedule = DayMask.from_list(schedule)
+    total_off_hours = schedule.off_hours
     
     if total_off_hours.is_integer():
         total_off_hours = int(total_off_hours)
     
     timeline_chars = []
+    on_mask = schedule.on
     for i in range(0, 48, 2):
-        s1 = schedule_list[i]
-        s2 = schedule_list[i+1]
+        pair = 0b11 << i
         
-        if s1 == 'off' and s2 == 'off':
+        if schedule.off & pair == pair:
             timeline_chars.append("🟥")
-        elif s1 == 'on' and s2 == 'on':
+        elif on_mask & pair == pair:
             timeline_chars.append("🟩")
         else:
             timeline_chars.append("🟧")
             
     timeline_visual = "".join(timeline_chars)
     intervals = []
-    start_index = None
     
-    for i, status in enumerate(schedule_list):
-        if status == 'off':
-            if start_index is None:
-                start_index = i
-        else:
-            if start_index is not None:
-                h1, m1 = divmod(start_index, 2)
-                h2, m2 = divmod(i, 2)
-                intervals.append(f"🕰 {h1:02d}:{'30' if m1 else '00'} - {h2:02d}:{'30' if m2 else '00'}")
-                start_index = None
-                
-    if start_index is not None:
-         h1, m1 = divmod(start_index, 2)
-         intervals.append(f"🕰 {h1:02d}:{'30' if m1 else '00'} - 24:00")
+    for start_index, end_index in schedule.off_intervals():
+        h1, m1 = divmod(start_index, 2)
+        if end_index >= 48:
+            intervals.append(f"🕰 {h1:02d}:{'30' if m1 else '00'} - 24:00")
+            continue
+        h2, m2 = divmod(end_index, 2)
+        intervals.append(f"🕰 {h1:02d}:{'30' if m1 else '00'} - {h2:02d}:{'30' if m2 else '00'}")
          
     intervals_text = "\n".join(intervals) if intervals else "🎉 Світло має бути весь день!"
     
@@ -92,22 +80,17 @@ async def send_schedule(message, user_id, group, region_code, is_edit=False, is_
     header = f"📍 {reg_obj.name} | Черга {group}\n\n"
     body = ""
 
-    async with db.get_session() as session:
-        # СЬОГОДНІ
-        stmt_t = select(Schedule).where(Schedule.region == db_region, Schedule.group_code == group, Schedule.date == today_str)
-        res_t = await session.execute(stmt_t)
-        rec_t = res_t.scalar_one_or_none()
-        if rec_t:
-            body += format_day_block(f"СЬОГОДНІ ({today_str})", json.loads(rec_t.hours_data), rec_t.site_updated_at)
-        else:
-            body += f"📅 СЬОГОДНІ ({today_str})\n⚪ Даних ще немає.\n"
+    # СЬОГОДНІ
+    data_t = await reg_obj.get_schedule(group, today_str)
+    if data_t:
+        body += format_day_block(f"СЬОГОДНІ ({today_str})", data_t['mask'], data_t['updated_at'])
+    else:
+        body += f"📅 СЬОГОДНІ ({today_str})\n⚪ Даних ще немає.\n"
 
-        # ЗАВТРА
-        stmt_tm = select(Schedule).where(Schedule.region == db_region, Schedule.group_code == group, Schedule.date == tomorrow_str)
-        res_tm = await session.execute(stmt_tm)
-        rec_tm = res_tm.scalar_one_or_none()
-        if rec_tm:
-            body += "\n\n" + format_day_block(f"ЗАВТРА ({tomorrow_str})", json.loads(rec_tm.hours_data), rec_tm.site_updated_at)
+    # ЗАВТРА
+    data_tm = await reg_obj.get_schedule(group, tomorrow_str)
+    if data_tm:
+        body += "\n\n" + format_day_block(f"ЗАВТРА ({tomorrow_str})", data_tm['mask'], data_tm['updated_at'])
 
     full_text = header + body
     builder = InlineKeyboardBuilder()
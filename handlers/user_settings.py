@@ -4,10 +4,12 @@ from aiogram.utils.keyboard import ReplyKeyboardBuilder, InlineKeyboardBuilder
 from sqlalchemy import update
 
 import database.db as db
+from core.config import config
 from database.models import User
 from regions.registry import get_region, get_all_regions_list
 from handlers.states import UserSetup
 from handlers.common import get_main_menu_keyboard
+from services.subscribers import subscriber_index
 
 router = Router()
 
@@ -63,10 +65,11 @@ async def process_group_choice(message: types.Message, state: FSMContext):
             username=message.from_user.full_name,
             region=region_code,
             group_number=group,
-            alert_time="00:00"
         )
-        await session.merge(new_user)
+        user = await session.merge(new_user)
         await session.commit()
+        subscriber_index.set_user(user.user_id, region_code, group, user.notification_mode, user.alert_time,
+                                  user.alert_lead_minutes)
 
     # Видаляємо повідомлення "⏳", щоб не смітити в чаті
     try:
@@ -93,6 +96,7 @@ async def open_settings_menu(callback: types.CallbackQuery):
     builder.button(text="🔔 Сповіщати завжди", callback_data="set_notify_always")
     builder.button(text="🌙 Тихий режим", callback_data="set_notify_no_night")
     builder.button(text="🔕 Не сповіщати", callback_data="set_notify_off")
+    builder.button(text="⏰ Попереджати за...", callback_data="choose_lead")
     builder.button(text="📝 Змінити дані", callback_data="reset_registration")
     builder.button(text="🔙 Назад", callback_data="back_to_menu")
     builder.adjust(1)
@@ -111,6 +115,7 @@ async def set_notification_mode(callback: types.CallbackQuery):
         stmt = update(User).where(User.user_id == callback.from_user.id).values(notification_mode=mode)
         await session.execute(stmt)
         await session.commit()
+    subscriber_index.set_mode(callback.from_user.id, mode)
     
     msg_map = {
         "always": "🔔 Завжди",
@@ -128,6 +133,47 @@ async def set_notification_mode(callback: types.CallbackQuery):
         parse_mode="Markdown"
     )
 
+@router.callback_query(F.data == "choose_lead")
+async def choose_alert_lead(callback: types.CallbackQuery):
+    await callback.answer()
+
+    builder = InlineKeyboardBuilder()
+    for minutes in config.ALERT_LEAD_CHOICES:
+        builder.button(text=f"{minutes} хв", callback_data=f"set_lead_{minutes}")
+    builder.button(text="🔙 Назад", callback_data="open_settings")
+    builder.adjust(len(config.ALERT_LEAD_CHOICES), 1)
+
+    await callback.message.edit_text(
+        "⏰ За скільки хвилин до відключення попереджати?",
+        reply_markup=builder.as_markup()
+    )
+
+@router.callback_query(F.data.startswith("set_lead_"))
+async def set_alert_lead(callback: types.CallbackQuery):
+    try:
+        minutes = int(callback.data.replace("set_lead_", ""))
+    except ValueError:
+        await callback.answer()
+        return
+    if minutes not in config.ALERT_LEAD_CHOICES:
+        await callback.answer()
+        return
+
+    async with db.get_session() as session:
+        stmt = update(User).where(User.user_id == callback.from_user.id).values(alert_lead_minutes=minutes)
+        await session.execute(stmt)
+        await session.commit()
+    subscriber_index.set_lead(callback.from_user.id, minutes)
+    await callback.answer(f"⏰ {minutes} хв")
+
+    builder = InlineKeyboardBuilder()
+    builder.button(text="🔙 В меню", callback_data="back_to_menu")
+
+    await callback.message.edit_text(
+        f"✅ Попереджатиму за {minutes} хв до відключення",
+        reply_markup=builder.as_markup()
+    )
+
 @router.callback_query(F.data == "reset_registration")
 async def reset_user_data(callback: types.CallbackQuery, state: FSMContext):
     await callback.answer()
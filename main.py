@@ -3,51 +3,45 @@ import logging
 import sys
 import os
 
-from aiogram import Bot, Dispatcher
-from aiogram.enums import ParseMode
-from aiogram.client.default import DefaultBotProperties
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-
-from core.config import config
-from core.logger import setup_logger
-import database.db as db
-
-from handlers import admin, schedules, user_settings, common
-from regions.registry import get_active_regions_list
-from services.broadcaster import notify_changes
-from services.checker import check_and_notify_upcoming_outages
-from middlewares.throttling import ThrottlingMiddleware
-from services.backup import backup_database
-from services.monitoring import system_health_check
-from core.browser import kill_zombie_processes, clean_temp_files
-
-setup_logger()
+# CPU-пул (core/cpu_pool.py) стартує процеси через spawn, і кожен з них
+# імпортує цей файл як __mp_main__. Тому на рівні модуля нічого важкого:
+# aiogram, хендлери, сервіси, БД і логер вантажаться лише в main().
 logger = logging.getLogger(__name__)
 
-async def scheduled_updates(bot: Bot):
-    """Оновлення даних для всіх регіонів послідовно."""
-    logger.info("[Scheduler] Початок планового оновлення...")
-    regions = get_active_regions_list()
-    
-    for region in regions:
-        kill_zombie_processes()
-        clean_temp_files()
-        try:
-            logger.info(f"[Scheduler] Оновлюю: {region.name}")
-            changed_groups = await region.update_data()
-            if changed_groups:
-                logger.info(f"[Scheduler] Зміни в {region.code}: {changed_groups}")
-                await notify_changes(bot, region.code, changed_groups)
-        except Exception as e:
-            logger.error(f"[Scheduler] Помилка в {region.name}: {e}")
-        await asyncio.sleep(2)
-    
-    kill_zombie_processes()
-    logger.info("[Scheduler] Всі регіони оброблено.")
+async def scheduled_updates(bot):
+    """Адаптивне опитування: оновлює лише ті регіони, яким настав час."""
+    from services.broadcaster import notify_changes
+    from services.polling import adaptive_poller
+
+    async def on_changes(region_code, changes):
+        await notify_changes(bot, region_code, changes)
+
+    await adaptive_poller.tick(on_changes)
 
 async def main():
+    from aiogram import Bot, Dispatcher
+    from aiogram.enums import ParseMode
+    from aiogram.client.default import DefaultBotProperties
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    from core.config import config
+    import database.db as db
+
+    from handlers import admin, schedules, user_settings, common
+    from middlewares.throttling import ThrottlingMiddleware
+    from services.backup import backup_database
+    from services.monitoring import system_health_check
+    from services.outbox import outbox
+    from services.subscribers import subscriber_index
+    from services.digest import digest_dispatcher
+    from services.alerts import alert_scheduler
+    from services.deferred import deferred_queue
+    from core.browser import shutdown_driver_pools
+    from core.cpu_pool import shutdown_cpu_pool
+
     await db.init_db()
     logger.info("[Main] База даних ініціалізована.")
+    await subscriber_index.load()
 
     bot = Bot(token=config.BOT_TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.MARKDOWN))
     dp = Dispatcher()
@@ -64,8 +58,7 @@ async def main():
 
     # Шедулер
     scheduler = AsyncIOScheduler()
-    scheduler.add_job(scheduled_updates, 'cron', minute='0,30', args=[bot])
-    scheduler.add_job(check_and_notify_upcoming_outages, 'interval', seconds=60, args=[bot])
+    scheduler.add_job(scheduled_updates, 'interval', minutes=1, args=[bot])
     scheduler.add_job(system_health_check, 'interval', minutes=60, args=[bot])
     scheduler.add_job(backup_database, 'cron', hour=3, minute=0)
     
@@ -73,6 +66,15 @@ async def main():
     logger.info("[Main] Шедулер запущено.")
 
     await bot.delete_webhook(drop_pending_updates=True)
+
+    # черга розсилок: дочищаємо те, що не встигли надіслати до перезапуску
+    await outbox.start(bot)
+    # щоденні дайджести о User.alert_time
+    digest_dispatcher.start()
+    # попередження про відключення за таймерами
+    alert_scheduler.start(bot)
+    # відкладене на ніч для "no_night" - о 07:00
+    deferred_queue.start()
     
     # Запуск оновлення при старті
     asyncio.create_task(scheduled_updates(bot))
@@ -83,9 +85,18 @@ async def main():
     except Exception as e:
         logger.error(f"[Main] Помилка: {e}")
     finally:
+        await deferred_queue.stop()
+        await alert_scheduler.stop()
+        await digest_dispatcher.stop()
+        await outbox.stop()
+        await asyncio.to_thread(shutdown_driver_pools)
+        shutdown_cpu_pool()
         await bot.session.close()
 
 if __name__ == "__main__":
+    from core.logger import setup_logger
+    setup_logger()
+
     if sys.platform == "win32":
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
     try:
@@ -1,5 +1,10 @@
+import asyncio
+import importlib
 from abc import ABC, abstractmethod
 
+from core.schedule_diff import ScheduleDiff
+from database.schedules import get_schedule as load_schedule
+
 class BaseRegion(ABC):
     """
     Абстрактний клас, який повинні наслідувати всі регіони.
@@ -28,21 +33,38 @@ class BaseRegion(ABC):
         """Повертає список доступних черг (груп)"""
         pass
 
-    @abstractmethod
     async def get_schedule(self, group: str, date: str) -> dict | None:
         """
+        Графік з кешу (database/schedules.py), при промаху - з БД.
         Повертає словник:
         {
-            'hours': ['on', 'off', ...], (48 значень по 30 хв)
+            'mask': DayMask(off=..., unknown=...), (48 слотів по 30 хв, core/schedule_bits.py)
             'updated_at': '12:00'
         }
         або None, якщо даних немає.
         """
-        pass
+        return await load_schedule(self.code, group, date)
     
-    async def update_data(self) -> list[str]:
+    # Короткий коментар до останнього update_data (напр. "картинка без змін")
+    last_update_note: str | None = None
+
+    # Модуль воркера (напр. "regions.volyn.worker"). Він тягне за собою
+    # selenium, cv2, numpy і т.д., тому імпортується лише при першому оновленні.
+    worker_module: str | None = None
+    _worker = None
+
+    async def load_worker(self):
+        """
+        Імпортує модуль воркера при першому виклику і кешує його. Перший
+        імпорт (cv2, numpy, selenium) займає секунди, тому йде в потоці.
+        """
+        if self._worker is None:
+            self._worker = await asyncio.to_thread(importlib.import_module, self.worker_module)
+        return self._worker
+
+    async def update_data(self) -> dict[str, ScheduleDiff]:
         """
         Опціональний метод для запуску парсингу.
-        Повертає список груп, де змінився графік.
+        Повертає {group: ScheduleDiff} груп, де змінились відключення.
         """
-        return []
\ No newline at end of file
+        return {}
\ No newline at end of file
@@ -1,25 +1,15 @@
-from .worker import update_data
-from database.models import Schedule
-import json
-import database.db as db
-from sqlalchemy import select
+import asyncio
+import importlib
+
+from database.schedules import get_schedule as load_schedule
 
 code = "lviv"
 name = "Львівська область"
 
 async def get_schedule(group_code: str, date_str: str):
-    async with db.get_session() as session:
-        stmt = select(Schedule).where(
-            Schedule.region == code,
-            Schedule.group_code == group_code,
-            Schedule.date == date_str
-        )
-        result = await session.execute(stmt)
-        record = result.scalar_one_or_none()
-        
-        if record:
-            return {
-                "hours": json.loads(record.hours_data),
-                "updated_at": record.site_updated_at
-            }
-    return None
\ No newline at end of file
+    return await load_schedule(code, group_code, date_str)
+
+async def update_data():
+    # воркер тягне selenium/cv2, тому імпортуємо його лише при оновленні і не в event loop
+    worker = await asyncio.to_thread(importlib.import_module, "regions.lviv.worker")
+    return await worker.update_data()
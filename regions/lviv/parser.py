@@ -1,10 +1,28 @@
 import logging
 import re
+from dataclasses import dataclass, field
 from bs4 import BeautifulSoup
+import lxml.html
 
 logger = logging.getLogger(__name__)
 
+DATE_RE = re.compile(r"відключень\s+на\s+(\d{2}\.\d{2}\.\d{4})")
+TIME_RE = re.compile(r"станом\s+на\s+(\d{2}[:.]\d{2})")
+GROUP_SPLIT_RE = re.compile(r"(?=Група\s+\d\.\d)")
+GROUP_RE = re.compile(r"Група\s+(\d\.\d)")
+INTERVAL_RE = re.compile(r"(\d{1,2})[:.](\d{2})\s*(?:до|-|–)\s*(\d{1,2})[:.](\d{2})")
+OUTAGE_MARKERS = ("немає", "вимкнен", "відключ")
+
+@dataclass
+class LvivSchedule:
+    date: str | None = None          # YYYY-MM-DD
+    update_time: str | None = None   # HH:MM
+    groups: dict[str, list[str]] = field(default_factory=dict)
+    # група -> [(start_slot, end_slot), ...], end не включно
+    intervals: dict[str, list[tuple[int, int]]] = field(default_factory=dict)
+
 def parse_lviv_text_data(html_content):
+    """Старий парсер (BeautifulSoup по всій сторінці). Лишився як база для бенчмарку."""
     soup = BeautifulSoup(html_content, 'lxml')
     text = soup.get_text(separator=' ')
     
@@ -53,4 +71,95 @@ def parse_lviv_text_data(html_content):
         
         schedule[group_id] = daily_schedule
 
-    return target_date, update_time, schedule
\ No newline at end of file
+    return target_date, update_time, schedule
+
+def _schedule_container_text(html_content):
+    """
+    Текст лише того блоку сторінки, де лежать дата і групи: найнижчий
+    спільний предок текстових вузлів "Група x.y" і "відключень на".
+    """
+    root = lxml.html.fromstring(html_content)
+    nodes = root.xpath(
+        '//body//text()[(contains(., "Група") or contains(., "відключень на"))'
+        ' and not(ancestor::script) and not(ancestor::style)]'
+    )
+    if not nodes:
+        return None
+
+    common = None
+    for node in nodes:
+        parent = node.getparent()
+        if node.is_tail:
+            parent = parent.getparent()
+        chain = [parent] + list(parent.iterancestors())
+        chain.reverse()
+        if common is None:
+            common = chain
+            continue
+        size = 0
+        for a, b in zip(common, chain):
+            if a is not b:
+                break
+            size += 1
+        common = common[:size]
+
+    if not common:
+        return None
+    container = common[-1]
+    return " ".join(container.xpath('.//text()[not(ancestor::script) and not(ancestor::style)]'))
+
+def _parse_text(text):
+    result = LvivSchedule()
+
+    date_match = DATE_RE.search(text)
+    if date_match:
+        try:
+            d, m, y = date_match.group(1).split('.')
+            result.date = f"{y}-{m}-{d}"
+        except ValueError:
+            logger.error(f"[LvivParser] Date parsing error: {date_match.group(1)}")
+
+    time_match = TIME_RE.search(text)
+    if time_match:
+        result.update_time = time_match.group(1).replace('.', ':')
+
+    for chunk in GROUP_SPLIT_RE.split(text):
+        group_match = GROUP_RE.match(chunk)
+        if not group_match:
+            continue
+
+        group_id = group_match.group(1)
+        daily_schedule = ["on"] * 48
+        ranges = []
+
+        lowered = chunk.lower()
+        if any(marker in lowered for marker in OUTAGE_MARKERS):
+            for s_h, s_m, e_h, e_m in INTERVAL_RE.findall(chunk):
+                start_idx = int(s_h) * 2 + (1 if int(s_m) >= 30 else 0)
+                end_idx = min(int(e_h) * 2 + (1 if int(e_m) >= 30 else 0), 48)
+                if end_idx > start_idx:
+                    # заповнення діапазону одним зрізом замість циклу по слотах
+                    daily_schedule[start_idx:end_idx] = ["off"] * (end_idx - start_idx)
+                    ranges.append((start_idx, end_idx))
+
+        result.groups[group_id] = daily_schedule
+        result.intervals[group_id] = ranges
+
+    return result
+
+def parse_lviv_page(html_content) -> LvivSchedule:
+    """
+    Основний парсер: lxml + XPath витягують тільки блок з графіком,
+    регулярки скомпільовані один раз. Якщо блок не знайдено, працює
+    старий шлях через BeautifulSoup по всій сторінці.
+    """
+    try:
+        text = _schedule_container_text(html_content)
+    except Exception as e:
+        logger.warning(f"[LvivParser] lxml path failed: {e}")
+        text = None
+
+    result = _parse_text(text) if text else LvivSchedule()
+    if not result.groups:
+        result = _parse_text(BeautifulSoup(html_content, 'lxml').get_text(separator=' '))
+    return result
\ No newline at end of file
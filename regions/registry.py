@@ -1,3 +1,5 @@
+# Адаптери легкі: код, назва, групи, читання з БД. Важкі воркери
+# (selenium, cv2, OCR) вантажаться лише при першому update_data().
 from regions.volyn.adapter import VolynRegion
 from regions.lviv.adapter import LvivRegion
 from regions.kyiv.adapter import KyivRegion
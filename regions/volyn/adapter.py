@@ -1,38 +1,20 @@
 from regions.base import BaseRegion
-import database.db as db
-from database.models import Schedule
-from sqlalchemy import select
-import json
 import logging
-from regions.volyn import worker
 
 class VolynRegion(BaseRegion):
     code = "volyn"
     name = "Волинська область"
     is_active = True
+    worker_module = "regions.volyn.worker"
 
     def get_groups(self) -> list[str]:
         return ["1.1", "1.2", "2.1", "2.2", "3.1", "3.2", 
                 "4.1", "4.2", "5.1", "5.2", "6.1", "6.2"]
 
-    async def get_schedule(self, group: str, date: str) -> dict | None:
-        async with db.get_session() as session:
-            stmt = select(Schedule).where(
-                Schedule.date == date,
-                Schedule.region == self.code,
-                Schedule.group_code == group
-            )
-            result = await session.execute(stmt)
-            record = result.scalar_one_or_none()
-            
-            if record:
-                return {
-                    "hours": json.loads(record.hours_data),
-                    "updated_at": record.site_updated_at
-                }
-            return None
-
     # concrete implementation of update_data
-    async def update_data(self) -> list[str]:
+    async def update_data(self) -> dict:
         logging.info("Запуск оновлення даних для волині...")
-        return await worker.run_update()
\ No newline at end of file
+        worker = await self.load_worker()
+        changed_groups = await worker.run_update()
+        self.last_update_note = worker.last_run_note
+        return changed_groups
\ No newline at end of file
@@ -0,0 +1,102 @@
+import os
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from core.config import config
+
+logger = logging.getLogger(__name__)
+
+CHAR_WHITELIST = "0123456789.:"
+UPSCALE = 2
+
+@dataclass
+class OcrText:
+    text: str
+    # (слово, впевненість 0..1) у порядку читання
+    words: list[tuple[str, float]] = field(default_factory=list)
+
+    def confidence_for(self, fragment: str) -> float:
+        """Середня впевненість слів, з яких складається знайдений фрагмент."""
+        confs = [conf for word, conf in self.words if word and (word in fragment or fragment in word)]
+        return sum(confs) / len(confs) if confs else 0.0
+
+class OcrEngine(ABC):
+    name = "abstract"
+
+    @abstractmethod
+    def recognize(self, image: Image.Image) -> OcrText:
+        pass
+
+class TesserocrEngine(OcrEngine):
+    """
+    Tesseract через C API (tesserocr): модель eng вантажиться один раз
+    і живе весь час роботи процесу. API не потокобезпечний, тому лок.
+    """
+    name = "tesserocr"
+
+    def __init__(self):
+        import tesserocr
+        self._api = tesserocr.PyTessBaseAPI(lang="eng", psm=tesserocr.PSM.SINGLE_BLOCK)
+        self._api.SetVariable("tessedit_char_whitelist", CHAR_WHITELIST)
+        self._lock = threading.Lock()
+
+    def recognize(self, image):
+        with self._lock:
+            self._api.SetImage(image)
+            text = self._api.GetUTF8Text()
+            words = [(word, conf / 100) for word, conf in self._api.MapWordConfidences()]
+        return OcrText(text=text, words=words)
+
+class PytesseractEngine(OcrEngine):
+    """Запасний варіант: окремий процес tesseract на кожен виклик."""
+    name = "pytesseract"
+
+    def __init__(self):
+        import pytesseract
+        if os.path.exists(config.TESSERACT_CMD):
+            pytesseract.pytesseract.tesseract_cmd = config.TESSERACT_CMD
+        self._pytesseract = pytesseract
+        self._config = f"--psm 6 -c tessedit_char_whitelist={CHAR_WHITELIST}"
+
+    def recognize(self, image):
+        data = self._pytesseract.image_to_data(
+            image, lang="eng", config=self._config, output_type=self._pytesseract.Output.DICT
+        )
+        words = [
+            (word, max(float(conf), 0) / 100)
+            for word, conf in zip(data["text"], data["conf"])
+            if word.strip()
+        ]
+        return OcrText(text=" ".join(word for word, _ in words), words=words)
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> OcrEngine:
+    """Повертає довгоживучий OCR-рушій процесу (tesserocr, якщо встановлено)."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            try:
+                _engine = TesserocrEngine()
+            except Exception as e:
+                logger.info(f"[OCR] tesserocr недоступний ({e}), використовую pytesseract.")
+                _engine = PytesseractEngine()
+            logger.info(f"[OCR] Рушій: {_engine.name}")
+        return _engine
+
+def preprocess(crop: Image.Image) -> Image.Image:
+    """Сірий, збільшення в UPSCALE разів і бінаризація Оцу: цифри стають чорними на білому."""
+    gray = np.asarray(crop.convert("L"))
+    gray = cv2.resize(gray, None, fx=UPSCALE, fy=UPSCALE, interpolation=cv2.INTER_CUBIC)
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    # tesseract краще читає темний текст на світлому фоні
+    if binary.mean() < 127:
+        binary = 255 - binary
+    return Image.fromarray(binary)
@@ -1,11 +1,14 @@
 import cv2
 import numpy as np
 from PIL import Image
-import pytesseract
 import io
 import re
+import hashlib
 import logging
+from collections import OrderedDict
+from dataclasses import dataclass
 from core.config import config
+from . import ocr
 
 
 TOP_TABLE_START_X = 205
@@ -16,32 +19,214 @@ LOCAL_STEP_X = 66.0
 LOCAL_STEP_Y = 60.5
 DATE_AREA = (0, 0, 1000, 400) 
 
+DATE_RE = re.compile(r"(\d{2}\.\d{2}\.\d{4})")
+TIME_RE = re.compile(r"(\d{2}:\d{2})")
+
+@dataclass
+class ImageInfo:
+    date: str | None = None        # dd.mm.yyyy
+    time: str | None = None        # hh:mm
+    date_confidence: float = 0.0   # 0..1
+    time_confidence: float = 0.0
+
 def get_info_from_image(image_bytes):
     """Отримує дату і час з картинки за допомогою OCR"""
     try:
         img = Image.open(io.BytesIO(image_bytes))
-        date_crop = img.crop(DATE_AREA)
-        text = pytesseract.image_to_string(date_crop, lang='ukr+eng', config='--psm 6')
-        text = text.replace("\n", " ")
+        date_crop = ocr.preprocess(img.crop(DATE_AREA))
+        result = ocr.get_engine().recognize(date_crop)
+        text = result.text.replace("\n", " ")
         logging.info(f"OCR текст: '{text}'")
         
-        found_date = None
-        found_time = None
+        info = ImageInfo()
 
         #search for date in format dd.mm.yyyy
-        date_match = re.search(r"(\d{2}\.\d{2}\.\d{4})", text)
+        date_match = DATE_RE.search(text)
         if date_match:
-            found_date = date_match.group(1)
+            info.date = date_match.group(1)
+            info.date_confidence = result.confidence_for(info.date)
         #search for time in format hh:mm
-        time_match = re.search(r"(\d{2}:\d{2})", text)
+        time_match = TIME_RE.search(text)
         if time_match:
-            found_time = time_match.group(1)
+            info.time = time_match.group(1)
+            info.time_confidence = result.confidence_for(info.time)
             
-        return found_date, found_time
+        return info
         
     except Exception as e:
         logging.error(f"Помилка OCR: {e}")
-        return None, None
+        return ImageInfo()
+
+# Пошук зсуву сітки навколо констант вище (пікселі) і масштабу кроку
+CALIBRATION_SHIFT = 30
+CALIBRATION_SCALES = np.linspace(0.97, 1.03, 13)
+ON_THRESHOLD = 160
+# клітинка зчитується по сітці PATCH_POINTS x PATCH_POINTS точок навколо центру
+PATCH_POINTS = 5
+
+_calibration_cache = OrderedDict()
+_CALIBRATION_CACHE_SIZE = 16
+
+@dataclass
+class GridCalibration:
+    top_x: float  # центр першої клітинки верхньої таблиці
+    top_y: float
+    bot_x: float
+    bot_y: float
+    step_x: float
+    step_y: float
+    score: float  # наскільки лінії сітки виділяються (1.0 = не знайдено, взято константи)
+
+@dataclass
+class GridSample:
+    schedule: dict
+    means: np.ndarray       # (12, 48) середня яскравість клітинки
+    confidence: np.ndarray  # (12, 48) 0..1, впевненість у статусі клітинки
+    calibration: GridCalibration
+
+def _line_profile(gray, axis, lo, hi):
+    """Сила вертикальних (axis=1) чи горизонтальних (axis=0) ліній у смузі lo..hi."""
+    if axis == 1:
+        band = gray[max(lo, 0):max(hi, 0)].astype(np.int16)
+        profile = np.abs(np.diff(band, axis=1)).sum(axis=0, dtype=np.int64)
+    else:
+        band = gray[:, max(lo, 0):max(hi, 0)].astype(np.int16)
+        profile = np.abs(np.diff(band, axis=0)).sum(axis=1, dtype=np.int64)
+    profile = np.pad(profile, (0, 1))
+    # лінія товщиною в кілька пікселів не повинна залежати від округлення
+    return np.maximum(np.maximum(profile, np.roll(profile, 1)), np.roll(profile, -1))
+
+def _fit_lines(profile, start, step, count):
+    """
+    Підбирає зсув і крок, за яких count+1 ліній сітки (межі клітинок
+    навколо центрів start + i*step) лягають на піки профілю.
+    Повертає (start, step, score).
+    """
+    shifts = np.arange(-CALIBRATION_SHIFT, CALIBRATION_SHIFT + 1)
+    steps = step * CALIBRATION_SCALES
+    k = np.arange(count + 1) - 0.5
+    # (shifts, scales, lines) -> індекси в профілі
+    positions = start + shifts[:, None, None] + k[None, None, :] * steps[None, :, None]
+    idx = np.clip(np.rint(positions).astype(np.intp), 0, len(profile) - 1)
+    scores = profile[idx].sum(axis=2)
+
+    best = np.unravel_index(np.argmax(scores), scores.shape)
+    baseline = scores.mean()
+    # без чітких ліній лишаємо константи
+    if scores[best] <= 0 or scores[best] < 1.15 * baseline:
+        return start, step, 1.0
+    return float(start + shifts[best[0]]), float(steps[best[1]]), float(scores[best] / baseline)
+
+# смуги для _layout_key через центри клітинок (за константами): кожен другий
+# рядок і кожен шостий стовпець - для голосування більшістю цього досить
+_KEY_ROWS = np.rint(np.concatenate([y0 + np.arange(0, 12, 2) * LOCAL_STEP_Y
+                                    for y0 in (TOP_TABLE_START_Y, BOT_TABLE_START_Y)])).astype(np.intp)
+_KEY_COLS = np.rint(np.union1d(TOP_TABLE_START_X + np.arange(1, 24, 6) * LOCAL_STEP_X,
+                               BOT_TABLE_START_X + np.arange(1, 24, 6) * LOCAL_STEP_X)).astype(np.intp)
+
+def _brightness(strips):
+    """Сума каналів BGR; sum(axis=-1) по трьох елементах у numpy у рази повільніший."""
+    strips = strips.astype(np.int16)
+    return strips[..., 0] + strips[..., 1] + strips[..., 2]
+
+def _strip_peaks(strips):
+    """
+    strips: (смуги, позиції) яскравості. Позиції (з точністю 4 px) країв,
+    що є на більшості смуг; сила краю не важлива.
+    """
+    # край лінії є на смузі, якщо стрибок яскравості помітно більший за шум
+    edges = 2 * (np.abs(np.diff(strips, axis=1)) > 60).sum(axis=0) > len(strips)
+    return np.unique(np.flatnonzero(edges) // 4)
+
+def _layout_key(img):
+    """
+    Хеш макета: розмір і положення ліній сітки. Ключ рахується на кожному
+    виклику, тому дивимось лише на смуги _KEY_ROWS/_KEY_COLS: лінії сітки
+    перетинають їх незалежно від кольору клітинок.
+    """
+    h, w = img.shape[:2]
+    rows = _brightness(img[_KEY_ROWS[_KEY_ROWS < h]])                           # (n, w)
+    cols = _brightness(np.take(img, _KEY_COLS[_KEY_COLS < w], axis=1)).T        # (m, h)
+    col_peaks, row_peaks = _strip_peaks(rows), _strip_peaks(cols)
+    digest = hashlib.sha1(col_peaks.tobytes() + b"|" + row_peaks.tobytes()).hexdigest()
+    return (img.shape[:2], digest)
+
+def calibrate_grid(img):
+    """Знаходить початок і крок обох таблиць по проєкціях ліній. Кешується за макетом."""
+    key = _layout_key(img)
+    cached = _calibration_cache.get(key)
+    if cached is not None:
+        _calibration_cache.move_to_end(key)
+        return cached
+
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    sx, sy = LOCAL_STEP_X, LOCAL_STEP_Y
+    fitted = {}
+    for name, x0, y0 in (("top", TOP_TABLE_START_X, TOP_TABLE_START_Y),
+                         ("bot", BOT_TABLE_START_X, BOT_TABLE_START_Y)):
+        y_lo, y_hi = int(y0 - sy), int(y0 + 12 * sy)
+        x_lo, x_hi = int(x0 - sx), int(x0 + 24 * sx)
+        fx = _fit_lines(_line_profile(gray, 1, y_lo, y_hi), x0, sx, 24)
+        fy = _fit_lines(_line_profile(gray, 0, x_lo, x_hi), y0, sy, 12)
+        fitted[name] = (fx, fy)
+
+    (tx, ty), (bx, by) = fitted["top"], fitted["bot"]
+    calibration = GridCalibration(
+        top_x=tx[0], top_y=ty[0], bot_x=bx[0], bot_y=by[0],
+        step_x=(tx[1] + bx[1]) / 2, step_y=(ty[1] + by[1]) / 2,
+        score=min(tx[2], ty[2], bx[2], by[2]),
+    )
+    _calibration_cache[key] = calibration
+    if len(_calibration_cache) > _CALIBRATION_CACHE_SIZE:
+        _calibration_cache.popitem(last=False)
+    return calibration
+
+def sample_grid(img):
+    """
+    Зчитує всі 12x48 клітинок одним індексованим gather: для кожної клітинки
+    береться PATCH_POINTS x PATCH_POINTS точок навколо центру, рахується
+    середня яскравість і частка точок, що погоджуються зі статусом.
+    """
+    cal = calibrate_grid(img)
+    h, w = img.shape[:2]
+
+    rows = np.arange(12)
+    cols = np.arange(48)
+    local_col = cols % 24
+    start_x = np.where(cols < 24, cal.top_x, cal.bot_x)
+    start_y = np.where(cols < 24, cal.top_y, cal.bot_y)
+    cx = np.rint(start_x + local_col * cal.step_x).astype(np.intp)                       # (48,)
+    cy = np.rint(start_y[None, :] + rows[:, None] * cal.step_y).astype(np.intp)          # (12, 48)
+
+    # точки розкидані по ~30% клітинки, але їх лише PATCH_POINTS^2, а не весь патч
+    half = max(1, int(min(cal.step_x, cal.step_y) * 0.15))
+    offsets = np.rint(np.linspace(-half, half, PATCH_POINTS)).astype(np.intp)
+    ys = cy[:, :, None, None] + offsets[None, None, :, None]
+    xs = cx[None, :, None, None] + offsets[None, None, None, :]
+    # яскравість як і раніше: середнє по каналах BGR (тут - їх сума)
+    # np.take по плоских індексах пікселів у кілька разів швидший за img[ys, xs]
+    flat = np.clip(ys, 0, h - 1) * w + np.clip(xs, 0, w - 1)                              # (12, 48, 5, 5)
+    pixels = np.take(img.reshape(-1, 3), flat.ravel(), axis=0).reshape(flat.shape + (3,))
+    sums = _brightness(pixels)
+
+    means = sums.mean(axis=(2, 3), dtype=np.float32) / 3
+    is_on = means > ON_THRESHOLD
+    agree = ((sums > 3 * ON_THRESHOLD) == is_on[:, :, None, None]).mean(axis=(2, 3))
+    margin = np.clip(np.abs(means - ON_THRESHOLD) / 40.0, 0.0, 1.0)
+    confidence = np.minimum(agree, margin)
+
+    outside = (cy >= h) | (cx[None, :] >= w)
+    status = np.where(is_on, 'on', 'off').astype(object)
+    status[outside] = 'unknown'
+    confidence[outside] = 0.0
+
+    schedule = {}
+    for row in range(12):
+        group_name = f"{row // 2 + 1}.{row % 2 + 1}"
+        schedule[group_name] = status[row].tolist()
+
+    return GridSample(schedule=schedule, means=means, confidence=confidence, calibration=cal)
 
 def parse_image(image_bytes):
     nparr = np.frombuffer(image_bytes, np.uint8)
@@ -51,37 +236,11 @@ def parse_image(image_bytes):
         logging.error("Помилка зчитування зображення OpenCV")
         return None
 
-    schedule = {}
-    
-    for row in range(12):
-        group_num = (row // 2) + 1
-        subgroup_num = (row % 2) + 1
-        group_name = f"{group_num}.{subgroup_num}"
-        row_data = []
-        
-        for col in range(48):
-            # Вибір таблиці
-            if col < 24:
-                start_x, start_y = TOP_TABLE_START_X, TOP_TABLE_START_Y
-                current_col = col
-            else:
-                start_x, start_y = BOT_TABLE_START_X, BOT_TABLE_START_Y
-                current_col = col - 24
-            
-            x = int(start_x + (current_col * LOCAL_STEP_X))
-            y = int(start_y + (row * LOCAL_STEP_Y))
-            
-            if y >= img.shape[0] or x >= img.shape[1]:
-                row_data.append('unknown')
-                continue
-
-            pixel = img[y, x]
-            b, g, r = pixel
-            brightness = (int(r) + int(g) + int(b)) / 3
-            
-            status = 'on' if brightness > 160 else 'off'
-            row_data.append(status)
-            
-        schedule[group_name] = row_data
-        
-    return schedule
\ No newline at end of file
+    sample = sample_grid(img)
+    cal = sample.calibration
+    low = int((sample.confidence < 0.5).sum())
+    logging.info(
+        f"Сітка: top=({cal.top_x:.0f},{cal.top_y:.0f}) bot=({cal.bot_x:.0f},{cal.bot_y:.0f}) "
+        f"step=({cal.step_x:.1f},{cal.step_y:.1f}) score={cal.score:.2f}, непевних клітинок: {low}"
+    )
+    return sample.schedule
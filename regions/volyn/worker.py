@@ -1,163 +1,259 @@
 import os
 import time
+import hashlib
 import requests
-import asyncio
 import logging
 import json
-from datetime import datetime
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
 import pytz 
+from urllib.parse import urljoin
 
 from selenium.webdriver.common.by import By
-from pyvirtualdisplay import Display
 
 from core.config import config
-import database.db as db
-from database.models import Schedule
-from sqlalchemy import select
+from database.schedules import save_schedules
+from database.source_state import get_source_state, save_source_state
 from . import parser 
-from core.browser import get_safe_driver
+from core.browser import get_driver_pool
+from core.retry import RetryPolicy, retry_scheduler
+from core.cpu_pool import run_cpu
 # Note: kill_zombie_processes and clean_temp_files removed from here to avoid conflicts
 
 logger = logging.getLogger(__name__)
 KYIV_TZ = pytz.timezone('Europe/Kyiv')
 PAGE_URL = "https://energy.volyn.ua/spozhyvacham/perervy-u-elektropostachanni/hrafik-vidkliuchen/"
+REGION_CODE = "volyn"
+RETRY_POLICY = RetryPolicy(attempts=3, base_delay=60, max_delay=240)
+IMAGE_SRC_RE = re.compile(r"""<img[^>]+src=["']([^"']*(?:GPV|(?i:grafik))[^"']*)["']""")
 
-def _download_attempt():
-    # Cleanup removed from here. It is now handled in main.py
-    
-    logger.info("[Worker] Starting virtual display...")
-    display = Display(visible=0, size=(1920, 1080))
-    display.start()
+# короткий підсумок останнього запуску для звіту циклу оновлення
+last_run_note = None
+
+# Warm browser on a virtual display, reused between attempts and update cycles
+driver_pool = get_driver_pool("volyn", version_main=144, use_display=True, profile="image")
+
+def _find_image_url(driver):
+    """Searches the loaded page (and its iframes) for the schedule image."""
+    target_url = None
+
+    # Searching for image
+    imgs = driver.find_elements(By.TAG_NAME, "img")
+    for img in imgs:
+        try:
+            src = img.get_attribute("src")
+            if src and ("GPV" in src or "grafik" in src.lower()):
+                target_url = src
+                logger.info(f"✨ [Worker] Found image: {src}")
+                break
+        except: continue
+
+    # Fallback to iframes if needed
+    if not target_url:
+        iframes = driver.find_elements(By.TAG_NAME, "iframe")
+        for i in range(len(iframes)):
+            try:
+                driver.switch_to.frame(i)
+                inner_imgs = driver.find_elements(By.TAG_NAME, "img")
+                for img in inner_imgs:
+                    s = img.get_attribute("src")
+                    if s and ("GPV" in s or "grafik" in s.lower()):
+                        target_url = s
+                        break
+                driver.switch_to.default_content()
+            except: driver.switch_to.default_content()
+            if target_url: break
+
+    return target_url
+
+@dataclass
+class ImageDownload:
+    url: str
+    content: bytes | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    not_modified: bool = False
+    # заповнюються лише після повного пошуку в браузері
+    cookies: dict | None = None
+    user_agent: str | None = None
+
+def _fetch_image(session, target_url, user_agent, known=None):
+    """
+    GET картинки. known: останній оброблений стан (SourceState). Якщо картинка
+    лежить за тим самим URL, запит іде з If-None-Match/If-Modified-Since.
+    """
+    headers = {"User-Agent": user_agent} if user_agent else {}
+    if known and known.source_url == target_url:
+        if known.etag: headers["If-None-Match"] = known.etag
+        if known.last_modified: headers["If-Modified-Since"] = known.last_modified
+    resp = session.get(target_url, headers=headers, timeout=30)
     
-    driver = None
-    file_content = None
+    if resp.status_code == 304:
+        return ImageDownload(url=target_url, etag=known.etag,
+                             last_modified=known.last_modified, not_modified=True)
+    # сторінка-заглушка антибота теж приходить з 200, тому перевіряємо тип
+    if resp.status_code == 200 and resp.headers.get("Content-Type", "image").startswith("image"):
+        return ImageDownload(url=target_url, content=resp.content,
+                             etag=resp.headers.get("ETag"),
+                             last_modified=resp.headers.get("Last-Modified"))
+    logger.error(f"[Worker] HTTP Error: {resp.status_code} ({resp.headers.get('Content-Type')})")
+    return None
+
+def _fast_path(state, known=None):
+    """
+    Спроба без браузера: cookies та User-Agent з останнього пошуку в Chrome.
+    Сторінку пробуємо прочитати простим GET, щоб помітити новий URL картинки,
+    а якщо її закрито антиботом - умовним GET перевіряємо останній відомий
+    URL, поки пошук у браузері не старший за VOLYN_DISCOVERY_INTERVAL.
+    Якщо за старим URL уже не картинка (404, заглушка) - йдемо в браузер.
+    """
+    if not state or not state.source_url or not state.user_agent:
+        return None
+
+    session = requests.Session()
+    session.cookies.update(json.loads(state.cookies or "{}"))
+    target_url = None
+
+    try:
+        resp = session.get(PAGE_URL, headers={"User-Agent": state.user_agent}, timeout=15)
+        if resp.status_code == 200:
+            match = IMAGE_SRC_RE.search(resp.text)
+            if match:
+                target_url = urljoin(PAGE_URL, match.group(1))
+    except requests.RequestException as e:
+        logger.info(f"[Worker] Fast path page probe failed: {e}")
+
+    if not target_url:
+        discovered = state.discovered_at
+        if discovered is None:
+            return None
+        if discovered.tzinfo is None:
+            # SQLite повертає DateTime без зони, пишемо ж UTC
+            discovered = discovered.replace(tzinfo=timezone.utc)
+        if (datetime.now(timezone.utc) - discovered).total_seconds() > config.VOLYN_DISCOVERY_INTERVAL:
+            return None
+        target_url = state.source_url
+
+    try:
+        download = _fetch_image(session, target_url, state.user_agent, known)
+    except requests.RequestException as e:
+        logger.info(f"[Worker] Fast path fetch failed: {e}")
+        return None
+    if download:
+        logger.info(f"⚡ [Worker] Fast path: {'304 Not Modified' if download.not_modified else 'downloaded'} {target_url}")
+    return download
+
+def _download_attempt(known=None):
+    # Cleanup removed from here. It is now handled in main.py
+    result = None
     
     try:
-        # 2. Use the shared driver function
-        driver = get_safe_driver(version_main=144)
-        driver.set_page_load_timeout(60)
-        
-        logger.info(f"[Worker] Opening: {PAGE_URL}")
-        driver.get(PAGE_URL)
-        time.sleep(10) 
-        
-        target_url = None
-
-        # Searching for image
-        imgs = driver.find_elements(By.TAG_NAME, "img")
-        for img in imgs:
-            try:
-                src = img.get_attribute("src")
-                if src and ("GPV" in src or "grafik" in src.lower()):
-                    target_url = src
-                    logger.info(f"✨ [Worker] Found image: {src}")
-                    break
-            except: continue
-
-        # Fallback to iframes if needed
-        if not target_url:
-            iframes = driver.find_elements(By.TAG_NAME, "iframe")
-            for i in range(len(iframes)):
-                try:
-                    driver.switch_to.frame(i)
-                    inner_imgs = driver.find_elements(By.TAG_NAME, "img")
-                    for img in inner_imgs:
-                        s = img.get_attribute("src")
-                        if s and ("GPV" in s or "grafik" in s.lower()):
-                            target_url = s
-                            break
-                    driver.switch_to.default_content()
-                except: driver.switch_to.default_content()
-                if target_url: break
-
-        # Downloading content
-        if target_url:
-            session = requests.Session()
-            for cookie in driver.get_cookies():
-                session.cookies.set(cookie['name'], cookie['value'])
+        with driver_pool.lease() as driver:
+            if retry_scheduler.cancel_requested(REGION_CODE):
+                return None
+            driver.set_page_load_timeout(60)
             
-            headers = {"User-Agent": driver.execute_script("return navigator.userAgent;")}
-            resp = session.get(target_url, headers=headers, timeout=30)
+            logger.info(f"[Worker] Opening: {PAGE_URL}")
+            driver_pool.load_page(driver, PAGE_URL)
+            # таймаут регіону перериває очікування одразу
+            if retry_scheduler.sleep(REGION_CODE, 10):
+                return None
             
-            if resp.status_code == 200:
-                file_content = resp.content
+            target_url = _find_image_url(driver)
+
+            # Downloading content
+            if target_url:
+                session = requests.Session()
+                cookies = {c['name']: c['value'] for c in driver.get_cookies()}
+                session.cookies.update(cookies)
+                
+                user_agent = driver.execute_script("return navigator.userAgent;")
+                result = _fetch_image(session, target_url, user_agent, known)
+                if result:
+                    result.cookies = cookies
+                    result.user_agent = user_agent
             else:
-                logger.error(f"[Worker] HTTP Error: {resp.status_code}")
-        else:
-            logger.warning("[Worker] Image not found in this attempt.")
+                logger.warning("[Worker] Image not found in this attempt.")
 
     except Exception as e:
         logger.error(f"[Worker] Attempt failed: {e}")
-    finally:
-        if driver:
-            try: driver.quit()
-            except: pass
-        try: display.stop()
-        except: pass
             
-    return file_content
-
-def download_with_retries():
-    """Main function with retry logic"""
-    max_retries = 3
-    for attempt in range(1, max_retries + 1):
-        logger.info(f"[Worker] Attempt #{attempt} of {max_retries}...")
-        
-        content = _download_attempt()
-        
-        if content:
-            logger.info("[Worker] Success")
-            return content
-        
-        if attempt < max_retries:
-            wait_time = 60
-            logger.warning(f"[Worker] Failed. Waiting {wait_time}s before retry...")
-            time.sleep(wait_time)
-    
-    logger.error("[Worker] Data not updated.")
-    return None
+    return result
+
+async def download_with_retries(known=None):
+    """Main function with retry logic (non-blocking backoff between attempts)"""
+    download = await retry_scheduler.run(REGION_CODE, _download_attempt, RETRY_POLICY, known)
+    if download:
+        logger.info("[Worker] Success")
+    else:
+        logger.error("[Worker] Data not updated.")
+    return download
+
+def _can_reuse(known):
+    """Чи можна пропустити обробку, якщо картинка виявиться тією самою."""
+    if not known or not known.content_hash:
+        return False
+    # без розпізнаної дати графік писався на "сьогодні", тож наступного дня треба переобробити
+    today = datetime.now(KYIV_TZ).strftime("%Y-%m-%d")
+    return bool(known.content_date) or known.processed_date == today
+
+def _state_fields(download):
+    fields = dict(source_url=download.url, etag=download.etag, last_modified=download.last_modified)
+    if download.user_agent:
+        fields.update(cookies=json.dumps(download.cookies), user_agent=download.user_agent,
+                      discovered_at=datetime.now(timezone.utc))
+    return fields
 
 async def run_update():
-    image_bytes = await asyncio.to_thread(download_with_retries)
+    global last_run_note
+    last_run_note = None
+
+    state = await get_source_state(REGION_CODE)
+    known = state if _can_reuse(state) else None
+    download = await retry_scheduler.to_thread(REGION_CODE, _fast_path, state, known)
+    if not download:
+        download = await download_with_retries(known)
     
-    if not image_bytes: return []
+    if not download: return []
+
+    content_hash = known.content_hash if download.not_modified else hashlib.sha256(download.content).hexdigest()
+    if known and known.content_hash == content_hash:
+        await save_source_state(REGION_CODE, **_state_fields(download))
+        saved = f", зекономлено ~{known.process_ms} мс" if known.process_ms else ""
+        last_run_note = f"картинка без змін{saved}"
+        logger.info(f"[Worker] Image unchanged (sha256 {content_hash[:12]}), OCR/parse skipped{saved}.")
+        return []
+
+    started = time.perf_counter()
+    image_bytes = download.content
     
-    ocr_date_str, ocr_time_str = await asyncio.to_thread(parser.get_info_from_image, image_bytes)
+    info = await run_cpu(parser.get_info_from_image, image_bytes)
+    ocr_date_str, ocr_time_str = info.date, info.time
+    logger.info(f"[Worker] OCR: date={info.date} ({info.date_confidence:.2f}), "
+                f"time={info.time} ({info.time_confidence:.2f})")
     target_date = datetime.now(KYIV_TZ).strftime("%Y-%m-%d")
+    content_date = None
     if ocr_date_str:
         try:
             d, m, y = ocr_date_str.split('.')
             target_date = f"{y}-{m}-{d}"
+            content_date = target_date
         except: pass
 
     if not ocr_time_str: ocr_time_str = datetime.now(KYIV_TZ).strftime("%H:%M")
 
-    new_schedule = await asyncio.to_thread(parser.parse_image, image_bytes)
+    new_schedule = await run_cpu(parser.parse_image, image_bytes)
     if not new_schedule: return []
 
-    changed_groups = []
-    async with db.get_session() as session:
-        for group_id, hours_data in new_schedule.items():
-            stmt = select(Schedule).where(
-                Schedule.date == target_date,
-                Schedule.region == "volyn",
-                Schedule.group_code == group_id
-            )
-            result = await session.execute(stmt)
-            old_record = result.scalar_one_or_none()
-            
-            if old_record:
-                if json.loads(old_record.hours_data) != hours_data:
-                    old_record.hours_data = json.dumps(hours_data)
-                    old_record.site_updated_at = ocr_time_str
-                    changed_groups.append(group_id)
-            else:
-                session.add(Schedule(
-                    date=target_date, region="volyn", group_code=group_id,
-                    hours_data=json.dumps(hours_data), site_updated_at=ocr_time_str
-                ))
-                changed_groups.append(group_id)
-        await session.commit()
+    changed_groups = await save_schedules(REGION_CODE, target_date, new_schedule, ocr_time_str)
+
+    await save_source_state(
+        REGION_CODE, **_state_fields(download),
+        content_hash=content_hash, content_date=content_date,
+        processed_date=datetime.now(KYIV_TZ).strftime("%Y-%m-%d"),
+        process_ms=int((time.perf_counter() - started) * 1000),
+    )
     
-    if changed_groups: logger.info(f"📢 [Update] Changes detected: {changed_groups}")
-    return changed_groups
\ No newline at end of file
+    if changed_groups: logger.info(f"📢 [Update] Changes detected: {list(changed_groups)}")
+    return changed_groups
@@ -0,0 +1,146 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta
+
+import pytz
+from aiogram import Bot
+
+from core.config import config
+from services.delivery import Outgoing, delivery
+from services.subscribers import subscriber_index
+from services.transitions import transition_index
+
+logger = logging.getLogger(__name__)
+KYIV_TZ = pytz.timezone('Europe/Kyiv')
+
+def _slot_start(date: str, slot: int) -> datetime:
+    day = datetime.strptime(date, "%Y-%m-%d")
+    return KYIV_TZ.localize(day + timedelta(minutes=30 * slot))
+
+def _is_quiet(moment: datetime) -> bool:
+    return moment.hour >= 23 or moment.hour < 7
+
+def _render(kind: str, group: str, lead: int, at: datetime) -> str:
+    if kind == "on":
+        return f"💡 За вашим графіком ({group}) о {at:%H:%M} світло має повернутись."
+    if lead:
+        return (f"🔌 **Попередження!**\nЧерез ~{lead} хвилин ({at:%H:%M}) за вашим графіком ({group}) "
+                f"планується **відключення** світла.")
+    return f"🔌 **Увага!**\nЗа вашим графіком ({group}) о {at:%H:%M} починається **відключення** світла."
+
+class AlertScheduler:
+    """
+    Попередження про відключення точно о "перехід мінус lead".
+
+    Переходи on->off та off->on на сьогодні й завтра бере з transition_index,
+    lead-час - з subscriber_index. Події лежать у купі за часом спрацювання,
+    а одна задача спить до найближчої з них. Зміна графіка чи налаштувань
+    лише позначає купу застарілою і будить задачу - між подіями роботи немає.
+    Повернення світла надсилається в момент переходу, без lead.
+    """
+
+    def __init__(self):
+        self._bot = None
+        self._task = None
+        self._wakeup = asyncio.Event()
+        self._dirty = True
+        self._heap = []        # (fire_at, event)
+        self._fired = set()    # event = (date, slot, kind, region, group, lead)
+        self._built_for = None
+
+    def mark_dirty(self, *_):
+        self._dirty = True
+        self._wakeup.set()
+
+    async def _rebuild(self, now: datetime):
+        today = now.strftime("%Y-%m-%d")
+        tomorrow = (now + timedelta(days=1)).strftime("%Y-%m-%d")
+        yesterday = (now - timedelta(days=1)).strftime("%Y-%m-%d")
+        for date in (yesterday, today, tomorrow):
+            await transition_index.ensure_loaded(date)
+        # ensure_loaded сам смикає mark_dirty - скидаємо після завантаження
+        self._dirty = False
+
+        grace = timedelta(seconds=config.ALERT_GRACE_SECONDS)
+        heap = []
+        for date in (today, tomorrow):
+            for slot, kind, (region, group) in transition_index.events(date):
+                at = _slot_start(date, slot)
+                leads = {0} if kind == "on" else subscriber_index.leads(region, group)
+                for lead in leads:
+                    event = (date, slot, kind, region, group, lead)
+                    fire_at = at - timedelta(minutes=lead)
+                    if fire_at + grace < now or event in self._fired:
+                        continue
+                    heap.append((fire_at, event))
+        heapq.heapify(heap)
+        self._heap = heap
+        self._fired = {e for e in self._fired if e[0] >= yesterday}
+        self._built_for = today
+        logger.debug(f"[Alerts] Armed {len(heap)} timers for {today}/{tomorrow}.")
+
+    async def _fire(self, events):
+        messages = []
+        for date, slot, kind, region, group, lead in events:
+            at = _slot_start(date, slot)
+            quiet = _is_quiet(at - timedelta(minutes=lead))
+            filter_lead = lead if kind == "off" else None
+            text = _render(kind, group, lead, at)
+            messages.extend(Outgoing(user_id, text)
+                            for user_id in subscriber_index.recipients(region, group, quiet, lead=filter_lead))
+        await delivery.deliver(self._bot, messages, label="alerts")
+
+    def _next_timeout(self, now: datetime):
+        midnight = KYIV_TZ.localize(datetime.combine(now.date() + timedelta(days=1), datetime.min.time()))
+        until = min(self._heap[0][0], midnight) if self._heap else midnight
+        return max(0.0, (until - now).total_seconds())
+
+    async def _run(self):
+        while True:
+            now = datetime.now(KYIV_TZ)
+            try:
+                if self._dirty or self._built_for != now.strftime("%Y-%m-%d"):
+                    await self._rebuild(now)
+
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap)[1])
+                if due:
+                    # у _fired лише після успішної відправки
+                    await self._fire(due)
+                    self._fired.update(due)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[Alerts] {e}")
+                # невідправлені події повернуться в купу при перебудові
+                self._dirty = True
+                await asyncio.sleep(60)
+                continue
+
+            self._wakeup.clear()
+            if self._dirty:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._next_timeout(datetime.now(KYIV_TZ)))
+            except asyncio.TimeoutError:
+                pass
+
+    def pending(self) -> int:
+        return len(self._heap)
+
+    def start(self, bot: Bot):
+        self._bot = bot
+        transition_index.listeners.append(self.mark_dirty)
+        subscriber_index.add_change_listener(self.mark_dirty)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+alert_scheduler = AlertScheduler()
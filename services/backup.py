@@ -1,8 +1,10 @@
 import os
-import shutil
+import sqlite3
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from core.config import config
+from database.schedules import prune_schedule_changes
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +15,15 @@ async def backup_database():
     if not os.path.exists(BACKUP_DIR):
         os.makedirs(BACKUP_DIR)
 
-    db_path = os.path.join(config.BASE_DIR, "database.db")
+    # історія змін графіків потрібна лише за SCHEDULE_CHANGES_KEEP_DAYS - чистимо тут, а не на кожному записі
+    try:
+        pruned = await prune_schedule_changes()
+        if pruned:
+            logger.info(f"[Backup] Pruned {pruned} old schedule changes.")
+    except Exception as e:
+        logger.error(f"[Backup] Pruning schedule changes failed: {e}")
+
+    db_path = os.path.join(config.BASE_DIR, config.DB_NAME)
     if not os.path.exists(db_path):
         logger.warning("[Backup] Database file not found.")
         return
@@ -23,7 +33,8 @@ async def backup_database():
     backup_path = os.path.join(BACKUP_DIR, filename)
 
     try:
-        shutil.copy2(db_path, backup_path)
+        # у WAL-режимі частина даних ще у -wal файлі, тому не копіюємо файл, а робимо sqlite backup
+        await asyncio.to_thread(_sqlite_backup, db_path, backup_path)
         logger.info(f"[Backup] Success: {filename}")
         
         # delete old backups
@@ -31,6 +42,15 @@ async def backup_database():
     except Exception as e:
         logger.error(f"[Backup] Failed: {e}")
 
+def _sqlite_backup(src_path, dst_path):
+    src = sqlite3.connect(src_path)
+    dst = sqlite3.connect(dst_path)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
 def cleanup_old_backups():
     #create beckup latest 7 days
     retention_days = 7
@@ -1,20 +1,26 @@
 import logging
-import asyncio
 from aiogram import Bot
-from sqlalchemy import select
 from datetime import datetime, timedelta
 import pytz
 
-import database.db as db
-from database.models import User
-from handlers.schedules import format_day_block 
+from core.schedule_diff import ScheduleDiff
+from handlers.schedules import format_day_block
 from regions.registry import get_region
+from services.deferred import deferred_queue
+from services.delivery import Outgoing
+from services.outbox import outbox
+from services.subscribers import subscriber_index
 
 logger = logging.getLogger(__name__)
 KYIV_TZ = pytz.timezone('Europe/Kyiv')
 
-async def notify_changes(bot: Bot, region_code: str, changed_groups: list[str]):
-    if not changed_groups: return
+async def notify_changes(bot: Bot, region_code: str, changes: dict[str, ScheduleDiff]):
+    """
+    Розсилає "що змінилось" по групах. changes - результат save_schedules:
+    групи без зміни відключень туди не потрапляють, однакові зміни
+    різних груп рендеряться один раз.
+    """
+    if not changes: return
 
     reg_obj = get_region(region_code)
     if not reg_obj: return
@@ -24,66 +30,50 @@ async def notify_changes(bot: Bot, region_code: str, changed_groups: list[str]):
     today_str = now_dt.strftime("%Y-%m-%d")
     tomorrow_str = (now_dt + timedelta(days=1)).strftime("%Y-%m-%d")
 
-    async with db.get_session() as session:
-        stmt = select(User).where(
-            User.region == region_code,
-            User.group_number.in_(changed_groups),
-            User.notification_mode != "off"
-        )
-        result = await session.execute(stmt)
-        users = result.scalars().all()
-
-    if not users: return
-
-    logger.info(f"[Broadcaster] Розсилка для {len(users)} юзерів ({region_code}).")
-
-
-    schedules_cache = {}
-    
-    for group in changed_groups:
-        # check for tomorrow and today
-        data_tmr = await reg_obj.get_schedule(group, tomorrow_str)
-        data_today = await reg_obj.get_schedule(group, today_str)
-
-        msg_header = ""
-        text_block = ""
-
-        if data_tmr:
-            # new schedule
-            msg_header = f"📅 **З'ЯВИВСЯ ГРАФІК НА ЗАВТРА ({tomorrow_str})**"
-            text_block = format_day_block(f"ЗАВТРА ({tomorrow_str})", data_tmr['hours'], data_tmr['updated_at'])
-        elif data_today:
-            # new schedule for today
-            msg_header = "⚠️ **УВАГА! ЗМІНА ГРАФІКА!**"
-            text_block = format_day_block(f"СЬОГОДНІ ({today_str})", data_today['hours'], data_today['updated_at'])
+    # минулі дати нікого вже не цікавлять
+    changes = {group: diff for group, diff in changes.items() if diff.date >= today_str}
+    if not changes: return
+
+    hour = now_dt.hour
+    quiet_hours = hour >= 23 or hour < 7
+    recipients = {group: subscriber_index.recipients(region_code, group, quiet_hours) for group in changes}
+    if quiet_hours:
+        # тихий режим: не губимо зміну, а відкладаємо до 07:00
+        muted = {group: subscriber_index.night_muted(region_code, group) for group in changes}
+        await deferred_queue.defer("changes", region_code, muted)
+    total = sum(len(ids) for ids in recipients.values())
+    if not total: return
+
+    logger.info(f"[Broadcaster] Розсилка для {total} юзерів ({region_code}).")
+
+    rendered = {}   # ScheduleDiff (або DayMask для нового графіка) -> текст
+    messages = []
+    for group, diff in changes.items():
+        user_ids = recipients.get(group)
+        if not user_ids: continue
+
+        day_title = "ЗАВТРА" if diff.date == tomorrow_str else "СЬОГОДНІ" if diff.date == today_str else diff.date
+        if diff.is_new:
+            # порівнювати нема з чим - показуємо весь день
+            data = await reg_obj.get_schedule(group, diff.date)
+            if not data: continue
+            header = f"📅 **З'ЯВИВСЯ ГРАФІК НА {day_title} ({diff.date})**"
+            key = (data['mask'], data['updated_at'], day_title)
+            if key not in rendered:
+                rendered[key] = format_day_block(f"{day_title} ({diff.date})", data['mask'], data['updated_at'])
         else:
-            continue
-            
-        schedules_cache[group] = (msg_header, text_block)
-
-    count_sent = 0
-    for user in users:
-        if user.notification_mode == "no_night":
-            current_hour = datetime.now(KYIV_TZ).hour
-            if current_hour >= 23 or current_hour < 7:
-                continue
-
-        cache_item = schedules_cache.get(user.group_number)
-        if not cache_item: continue
-        
-        header, body = cache_item
+            header = f"⚠️ **УВАГА! ЗМІНА ГРАФІКА НА {day_title} ({diff.date})**"
+            key = diff
+            if key not in rendered:
+                rendered[key] = diff.summary()
 
         msg_text = (
             f"{header}\n"
-            f"📍 {reg_obj.name} | Черга {user.group_number}\n\n"
-            f"{body}"
+            f"📍 {reg_obj.name} | Черга {group}\n\n"
+            f"{rendered[key]}"
         )
+        messages.extend(Outgoing(user_id, msg_text) for user_id in user_ids)
 
-        try:
-            await bot.send_message(user.user_id, msg_text, parse_mode="Markdown")
-            count_sent += 1
-            await asyncio.sleep(0.05)
-        except Exception:
-            pass
-
-    logger.info(f"[Broadcaster] Надіслано: {count_sent}")
\ No newline at end of file
+    if not messages: return
+    await outbox.enqueue(f"changes:{region_code}", messages, parse_mode="Markdown")
+    logger.info(f"[Broadcaster] У черзі на відправку: {len(messages)} ({len(rendered)} унікальних змін)")
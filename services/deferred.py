@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import pytz
+from sqlalchemy import case, select
+from sqlalchemy.dialects.sqlite import insert
+
+import database.db as db
+from database.models import DeferredMessage
+from services.delivery import Outgoing
+from services.outbox import outbox
+from services.subscribers import subscriber_index
+
+logger = logging.getLogger(__name__)
+KYIV_TZ = pytz.timezone('Europe/Kyiv')
+
+QUIET_END_HOUR = 7
+INSERT_CHUNK = 5000
+
+def _is_quiet(moment: datetime) -> bool:
+    return moment.hour >= 23 or moment.hour < QUIET_END_HOUR
+
+class DeferredQueue:
+    """
+    Відкладені сповіщення для режиму "no_night".
+
+    Уночі замість пропуску кладемо рядок (user, region, group) у таблицю
+    deferred: повторні зміни за ніч лише оновлюють той самий рядок, тож
+    черга не росте понад кількість підписок. О 07:00 для кожної групи один
+    раз рендеримо актуальний графік і ставимо все однією розсилкою в outbox.
+    """
+
+    def __init__(self):
+        self._task = None
+
+    async def defer(self, kind: str, region: str, recipients: dict[str, list[int]]) -> int:
+        """recipients: group -> user_id. kind: "changes" | "digest"."""
+        now = datetime.now(timezone.utc)
+        rows = [
+            {"user_id": uid, "region": region, "group_code": group, "kind": kind, "queued_at": now}
+            for group, user_ids in recipients.items() for uid in user_ids
+        ]
+        if not rows:
+            return 0
+
+        stmt = insert(DeferredMessage)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "region", "group_code"],
+            set_={
+                # зміна графіка важливіша за дайджест - "changes" не перетираємо
+                "kind": case((DeferredMessage.kind == "changes", "changes"), else_=stmt.excluded.kind),
+                "queued_at": stmt.excluded.queued_at,
+            },
+        )
+        async with db.get_session() as session:
+            for i in range(0, len(rows), INSERT_CHUNK):
+                await session.execute(stmt, rows[i:i + INSERT_CHUNK])
+            await session.commit()
+        logger.info(f"[Deferred] {kind}:{region}: відкладено {len(rows)} до ранку.")
+        return len(rows)
+
+    async def _render(self, kind: str, region: str, group: str, now: datetime) -> str | None:
+        # digest сам кладе сюди нічні дайджести, тому імпорт тут
+        from services.digest import digest_dispatcher
+
+        body = await digest_dispatcher.render(region, group, now)
+        if body and kind == "changes":
+            body = "🌙 **Уночі графік змінювався.** Актуальний стан:\n\n" + body
+        return body
+
+    async def flush(self, now: datetime | None = None) -> int:
+        """Надсилає все накопичене. Повертає кількість повідомлень."""
+        now = now or datetime.now(KYIV_TZ)
+        started = datetime.now(timezone.utc)
+        async with db.get_session() as session:
+            rows = (await session.execute(
+                select(DeferredMessage.user_id, DeferredMessage.region,
+                       DeferredMessage.group_code, DeferredMessage.kind)
+            )).all()
+        if not rows:
+            return 0
+
+        by_group = defaultdict(list)
+        for row in rows:
+            by_group[(row.kind, row.region, row.group_code)].append(row.user_id)
+
+        messages = []
+        for (kind, region, group), user_ids in by_group.items():
+            # за ніч користувач міг змінити групу або вимкнути сповіщення
+            current = set(subscriber_index.recipients(region, group))
+            user_ids = [uid for uid in user_ids if uid in current]
+            text = await self._render(kind, region, group, now) if user_ids else None
+            if text:
+                messages.extend(Outgoing(uid, text) for uid in user_ids)
+
+        if messages:
+            await outbox.enqueue("deferred", messages, parse_mode="Markdown")
+        async with db.get_session() as session:
+            # рядки, оновлені під час розсилки, лишаються на наступний раз
+            await session.execute(DeferredMessage.__table__.delete()
+                                  .where(DeferredMessage.queued_at <= started))
+            await session.commit()
+        logger.info(f"[Deferred] Ранкова розсилка: {len(messages)} з {len(rows)} відкладених.")
+        return len(messages)
+
+    def _next_flush(self, now: datetime) -> datetime:
+        day = now.date() if now.hour < QUIET_END_HOUR else now.date() + timedelta(days=1)
+        return KYIV_TZ.localize(datetime.combine(day, datetime.min.time()).replace(hour=QUIET_END_HOUR))
+
+    async def _run(self):
+        while True:
+            now = datetime.now(KYIV_TZ)
+            # вдень черга зазвичай порожня; непорожня - бот стояв о 07:00
+            if not _is_quiet(now):
+                try:
+                    await self.flush(now)
+                except Exception as e:
+                    logger.error(f"[Deferred] Flush failed: {e}")
+            delay = (self._next_flush(datetime.now(KYIV_TZ)) - datetime.now(KYIV_TZ)).total_seconds()
+            await asyncio.sleep(max(1.0, delay))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+deferred_queue = DeferredQueue()
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+
+from core.config import config
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Outgoing:
+    chat_id: int
+    text: str
+    parse_mode: str | None = None   # None - parse_mode бота за замовчуванням
+    attempts: int = 0
+    outcome: str | None = None      # sent | blocked | bad_request | failed
+    in_flight: bool = False         # запит у Telegram пішов, відповіді ще немає
+
+@dataclass
+class DeliveryReport:
+    label: str
+    total: int = 0
+    outcomes: Counter = field(default_factory=Counter)  # sent | blocked | bad_request | failed
+    retry_after_waits: int = 0
+    duration: float = 0.0
+    # чати, які заблокували бота або не існують (передаються dead_chat_listeners)
+    dead_chats: list[int] = field(default_factory=list)
+
+    @property
+    def sent(self) -> int:
+        return self.outcomes["sent"]
+
+    def as_line(self) -> str:
+        rest = ", ".join(f"{k}: {v}" for k, v in self.outcomes.items() if k != "sent")
+        return (f"{self.label}: {self.sent}/{self.total} за {self.duration:.1f}с"
+                f"{f' ({rest})' if rest else ''}"
+                f"{f', flood-wait x{self.retry_after_waits}' if self.retry_after_waits else ''}")
+
+class TokenBucket:
+    """Глобальний ліміт повідомлень на секунду (спільний для всіх розсилок)."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Telegram попросив почекати (RetryAfter): зупиняємо всіх відправників."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class DeliveryEngine:
+    """
+    Спільний рушій розсилок: глобальний token bucket біля лімітів Telegram
+    (~30 повідомлень/с), не частіше одного повідомлення на чат за
+    DELIVERY_PER_CHAT_INTERVAL, обмежений пул відправників, обробка
+    RetryAfter і підрахунок результатів кожної відправки.
+    """
+
+    def __init__(self, rate, workers, per_chat_interval, max_attempts=3):
+        self.bucket = TokenBucket(rate, capacity=rate)
+        self.workers = workers
+        self.per_chat_interval = per_chat_interval
+        self.max_attempts = max_attempts
+        self._chat_next = {}
+        # async func(chat_ids) після розсилки, у якій були мертві чати
+        self._dead_chat_listeners = []
+
+    def add_dead_chat_listener(self, func):
+        self._dead_chat_listeners.append(func)
+
+    async def _wait_chat(self, chat_id):
+        now = time.monotonic()
+        ready_at = self._chat_next.get(chat_id, 0.0)
+        self._chat_next[chat_id] = max(now, ready_at) + self.per_chat_interval
+        if ready_at > now:
+            await asyncio.sleep(ready_at - now)
+
+    def _forget_old_chats(self):
+        now = time.monotonic()
+        for chat_id in [c for c, t in self._chat_next.items() if t < now]:
+            del self._chat_next[chat_id]
+
+    async def _send(self, bot: Bot, item: Outgoing, report: DeliveryReport, queue: asyncio.Queue):
+        await self._wait_chat(item.chat_id)
+        await self.bucket.acquire()
+        item.attempts += 1
+        kwargs = {} if item.parse_mode is None else {"parse_mode": item.parse_mode}
+        item.in_flight = True
+        try:
+            await bot.send_message(item.chat_id, item.text, **kwargs)
+            self._finish(item, report, "sent")
+        except TelegramRetryAfter as e:
+            # Telegram відмовив - повідомлення точно не дійшло
+            item.in_flight = False
+            report.retry_after_waits += 1
+            logger.warning(f"[Delivery:{report.label}] Flood wait {e.retry_after}s.")
+            self.bucket.pause(e.retry_after)
+            await self._retry_or_fail(item, report, queue)
+        except TelegramForbiddenError:
+            self._finish(item, report, "blocked")
+            report.dead_chats.append(item.chat_id)
+        except TelegramBadRequest as e:
+            if "chat not found" in str(e).lower():
+                report.dead_chats.append(item.chat_id)
+            self._finish(item, report, "bad_request")
+            logger.debug(f"[Delivery:{report.label}] Bad request for {item.chat_id}: {e}")
+        except (TelegramNetworkError, TelegramServerError) as e:
+            logger.warning(f"[Delivery:{report.label}] {item.chat_id}: {e}")
+            await asyncio.sleep(min(2 ** item.attempts, 30))
+            await self._retry_or_fail(item, report, queue)
+        except Exception as e:
+            self._finish(item, report, "failed")
+            logger.error(f"[Delivery:{report.label}] Error sending to {item.chat_id}: {e}")
+
+    def _finish(self, item, report, outcome):
+        item.outcome = outcome
+        item.in_flight = False
+        report.outcomes[outcome] += 1
+
+    async def _retry_or_fail(self, item, report, queue):
+        if item.attempts < self.max_attempts:
+            item.in_flight = False
+            await queue.put(item)
+        else:
+            self._finish(item, report, "failed")
+
+    async def _worker(self, bot, queue, report):
+        while True:
+            item = await queue.get()
+            try:
+                await self._send(bot, item, report, queue)
+            finally:
+                queue.task_done()
+
+    async def deliver(self, bot: Bot, messages, label: str = "send") -> DeliveryReport:
+        """Надсилає всі повідомлення і чекає завершення. Повертає звіт."""
+        messages = list(messages)
+        report = DeliveryReport(label=label, total=len(messages))
+        if not messages:
+            return report
+
+        started = time.monotonic()
+        queue = asyncio.Queue()
+        for item in messages:
+            queue.put_nowait(item)
+
+        workers = [
+            asyncio.create_task(self._worker(bot, queue, report))
+            for _ in range(min(self.workers, len(messages)))
+        ]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._forget_old_chats()
+
+        report.duration = time.monotonic() - started
+        logger.info(f"[Delivery] {report.as_line()}")
+        if report.dead_chats:
+            for listener in self._dead_chat_listeners:
+                try:
+                    await listener(report.dead_chats)
+                except Exception as e:
+                    logger.error(f"[Delivery] Dead chat listener {listener.__name__} failed: {e}")
+        return report
+
+delivery = DeliveryEngine(
+    rate=config.DELIVERY_RATE,
+    workers=config.DELIVERY_WORKERS,
+    per_chat_interval=config.DELIVERY_PER_CHAT_INTERVAL,
+)
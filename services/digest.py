@@ -0,0 +1,137 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytz
+
+from handlers.schedules import format_day_block
+from regions.registry import get_region
+from services.deferred import deferred_queue
+from services.delivery import Outgoing
+from services.outbox import outbox
+from services.subscribers import subscriber_index
+
+logger = logging.getLogger(__name__)
+KYIV_TZ = pytz.timezone('Europe/Kyiv')
+
+def _is_quiet_minute(minute: int) -> bool:
+    hour = minute // 60
+    return hour >= 23 or hour < 7
+
+class DigestDispatcher:
+    """
+    Щоденний дайджест о User.alert_time.
+
+    Кошики користувачів за хвилиною доби тримає subscriber_index, тож
+    диспетчер спить до найближчої хвилини, на яку хтось підписаний,
+    рендерить блок графіка один раз на (region, group) і ставить
+    розсилку в outbox одним пакетом.
+    """
+
+    def __init__(self):
+        self._task = None
+        self._wakeup = asyncio.Event()
+        self._armed = None      # (хвилина доби, момент), на яку спить _run
+        self._last_at = None    # момент останньої відправленої хвилини
+
+    async def render(self, region_code: str, group: str, now: datetime) -> str | None:
+        reg_obj = get_region(region_code)
+        if not reg_obj:
+            return None
+        today_str = now.strftime("%Y-%m-%d")
+        tomorrow_str = (now + timedelta(days=1)).strftime("%Y-%m-%d")
+
+        data_today = await reg_obj.get_schedule(group, today_str)
+        data_tmr = await reg_obj.get_schedule(group, tomorrow_str)
+        if not data_today and not data_tmr:
+            return None
+
+        body = f"🌅 **Графік на сьогодні**\n📍 {reg_obj.name} | Черга {group}\n\n"
+        if data_today:
+            body += format_day_block(f"СЬОГОДНІ ({today_str})", data_today['mask'], data_today['updated_at'])
+        else:
+            body += f"📅 СЬОГОДНІ ({today_str})\n⚪ Даних ще немає.\n"
+        if data_tmr:
+            body += "\n\n" + format_day_block(f"ЗАВТРА ({tomorrow_str})", data_tmr['mask'], data_tmr['updated_at'])
+        return body
+
+    async def dispatch(self, minute: int, now: datetime | None = None) -> int:
+        """Ставить у чергу дайджести для хвилини доби minute. Повертає кількість повідомлень."""
+        now = now or datetime.now(KYIV_TZ)
+        quiet_hours = _is_quiet_minute(minute)
+        recipients = subscriber_index.digest_recipients(minute, quiet_hours=quiet_hours)
+        if quiet_hours:
+            # "no_night" отримає дайджест о 07:00 разом з іншими відкладеними
+            muted = defaultdict(dict)
+            for (region_code, group), user_ids in subscriber_index.digest_night_muted(minute).items():
+                muted[region_code][group] = user_ids
+            for region_code, groups in muted.items():
+                await deferred_queue.defer("digest", region_code, groups)
+        if not recipients:
+            return 0
+
+        messages = []
+        for (region_code, group), user_ids in recipients.items():
+            text = await self.render(region_code, group, now)
+            if text:
+                messages.extend(Outgoing(user_id, text) for user_id in user_ids)
+
+        if messages:
+            await outbox.enqueue(f"digest:{minute // 60:02d}:{minute % 60:02d}", messages, parse_mode="Markdown")
+        logger.info(f"[Digest] {minute // 60:02d}:{minute % 60:02d}: {len(messages)} messages "
+                    f"for {len(recipients)} groups.")
+        return len(messages)
+
+    def _next_run(self, now: datetime):
+        """Найближча (строго після поточної) хвилина з підписниками і момент її настання."""
+        minutes = subscriber_index.alert_minutes()
+        if not minutes:
+            return None, None
+        current = now.hour * 60 + now.minute
+        upcoming = next((m for m in minutes if m > current), minutes[0] + 1440)
+        at = now.replace(second=0, microsecond=0) + timedelta(minutes=upcoming - current)
+        return upcoming % 1440, KYIV_TZ.normalize(at)
+
+    async def _run(self):
+        while True:
+            now = datetime.now(KYIV_TZ)
+            # пробудження (зміна налаштувань) могло прийти за мить до або після
+            # взведеної хвилини - вона все одно має піти, рівно один раз
+            if self._armed and self._armed[1] <= now and self._armed[1] != self._last_at:
+                minute, at = self._armed
+                self._armed = None
+                self._last_at = at
+                try:
+                    await self.dispatch(minute)
+                except Exception as e:
+                    logger.error(f"[Digest] Dispatch failed: {e}")
+                continue
+
+            # таймер міг спрацювати на мить раніше - не відправляємо ту саму хвилину двічі
+            base = max(now, self._last_at) if self._last_at else now
+            minute, at = self._next_run(base)
+            self._armed = (minute, at) if at else None
+            timeout = max(0.0, (at - datetime.now(KYIV_TZ)).total_seconds()) if at else None
+
+            self._wakeup.clear()
+            try:
+                # змінились підписники - перераховуємо найближчу хвилину
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def wake(self):
+        self._wakeup.set()
+
+    def start(self):
+        subscriber_index.add_change_listener(self.wake)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+digest_dispatcher = DigestDispatcher()
@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from aiogram import Bot
+from sqlalchemy import func, insert, select, update
+
+import database.db as db
+from core.config import config
+from database.models import OutboxJob, OutboxMessage
+from services.delivery import Outgoing, delivery
+
+logger = logging.getLogger(__name__)
+
+INSERT_CHUNK = 5000
+FINAL_STATUSES = ("sent", "blocked", "failed", "interrupted")
+
+class Outbox:
+    """
+    Черга вихідних повідомлень у SQLite, яка переживає перезапуск бота.
+
+    Розсилка = рядок outbox_jobs + рядки outbox (по одному на отримувача),
+    вставлені пакетно. Дренер забирає пачки pending-рядків, позначає їх
+    "sending", надсилає через delivery і записує результат. Рядки, що
+    лишились у "sending" після падіння, вважаються "interrupted" і
+    повторно не надсилаються: краще недоставити, ніж надіслати двічі.
+    При зупинці бота поточна пачка дописується, а перервана розсилка
+    повертає в pending усе, що ще не йшло в Telegram.
+    """
+
+    def __init__(self):
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._stopping = False
+        self._last_report = {}
+
+    async def enqueue(self, label: str, messages: list[Outgoing], text: str | None = None,
+                      parse_mode: str | None = None, report_chat_id: int | None = None,
+                      report_message_id: int | None = None) -> int:
+        """
+        Створює розсилку. Якщо text задано, він спільний для всіх і в рядки
+        не пишеться (тоді Outgoing.text може бути None).
+        """
+        async with db.get_session() as session:
+            job = OutboxJob(label=label, text=text, parse_mode=parse_mode,
+                            total=len(messages), report_chat_id=report_chat_id,
+                            report_message_id=report_message_id)
+            session.add(job)
+            await session.flush()
+
+            rows = [
+                {"job_id": job.id, "chat_id": m.chat_id,
+                 "text": None if text is not None else m.text, "status": "pending", "attempts": 0}
+                for m in messages
+            ]
+            for i in range(0, len(rows), INSERT_CHUNK):
+                await session.execute(insert(OutboxMessage), rows[i:i + INSERT_CHUNK])
+            await session.commit()
+            job_id = job.id
+
+        logger.info(f"[Outbox] Job #{job_id} '{label}': queued {len(messages)} messages.")
+        self._wakeup.set()
+        return job_id
+
+    async def recover(self):
+        """Після перезапуску: те, що було "в дорозі", вже могло дійти - не надсилаємо вдруге."""
+        async with db.get_session() as session:
+            result = await session.execute(
+                update(OutboxMessage).where(OutboxMessage.status == "sending").values(status="interrupted")
+            )
+            cutoff = datetime.utcnow() - timedelta(days=config.OUTBOX_KEEP_DAYS)
+            old_jobs = select(OutboxJob.id).where(OutboxJob.finished_at < cutoff)
+            await session.execute(OutboxMessage.__table__.delete().where(OutboxMessage.job_id.in_(old_jobs)))
+            await session.execute(OutboxJob.__table__.delete().where(OutboxJob.finished_at < cutoff))
+            await session.commit()
+        if result.rowcount:
+            logger.warning(f"[Outbox] {result.rowcount} messages were in flight during restart, marked interrupted.")
+
+    async def _claim_batch(self):
+        now = datetime.utcnow()
+        async with db.get_session() as session:
+            result = await session.execute(
+                select(OutboxMessage.id, OutboxMessage.job_id, OutboxMessage.chat_id,
+                       OutboxMessage.text, OutboxMessage.attempts)
+                .where(OutboxMessage.status == "pending")
+                .where((OutboxMessage.next_attempt_at.is_(None)) | (OutboxMessage.next_attempt_at <= now))
+                .order_by(OutboxMessage.id)
+                .limit(config.OUTBOX_BATCH)
+            )
+            rows = result.all()
+            if rows:
+                await session.execute(update(OutboxMessage)
+                                      .where(OutboxMessage.id.in_([r.id for r in rows]))
+                                      .values(status="sending"))
+                job_ids = {r.job_id for r in rows}
+                jobs = (await session.execute(
+                    select(OutboxJob.id, OutboxJob.text, OutboxJob.parse_mode).where(OutboxJob.id.in_(job_ids))
+                )).all()
+                await session.commit()
+            else:
+                jobs = []
+        return rows, {j.id: j for j in jobs}
+
+    async def _store_results(self, rows, items):
+        by_status = defaultdict(list)
+        retry, unsent = [], []
+        for row, item in zip(rows, items):
+            if item.outcome is None:
+                # розсилку перервали: в дорозі - interrupted, решта - назад у чергу
+                if item.in_flight:
+                    by_status["interrupted"].append(row.id)
+                else:
+                    unsent.append(row.id)
+            elif item.outcome == "failed" and row.attempts + 1 < config.OUTBOX_MAX_ATTEMPTS:
+                retry.append(row)
+            else:
+                status = item.outcome if item.outcome in ("sent", "blocked") else "failed"
+                by_status[status].append(row.id)
+
+        async with db.get_session() as session:
+            for status, ids in by_status.items():
+                await session.execute(update(OutboxMessage).where(OutboxMessage.id.in_(ids))
+                                      .values(status=status, attempts=OutboxMessage.attempts + 1))
+            if retry:
+                delay = timedelta(seconds=config.OUTBOX_RETRY_DELAY)
+                await session.execute(update(OutboxMessage)
+                                      .where(OutboxMessage.id.in_([r.id for r in retry]))
+                                      .values(status="pending", attempts=OutboxMessage.attempts + 1,
+                                              next_attempt_at=datetime.utcnow() + delay))
+            if unsent:
+                await session.execute(update(OutboxMessage).where(OutboxMessage.id.in_(unsent))
+                                      .values(status="pending"))
+            await session.commit()
+
+    async def job_progress(self, job_id: int) -> dict[str, int]:
+        async with db.get_session() as session:
+            result = await session.execute(
+                select(OutboxMessage.status, func.count()).where(OutboxMessage.job_id == job_id)
+                .group_by(OutboxMessage.status)
+            )
+            return dict(result.all())
+
+    async def _report(self, bot: Bot, job_ids):
+        for job_id in job_ids:
+            counts = await self.job_progress(job_id)
+            done = not counts.get("pending") and not counts.get("sending")
+            if not done and time.monotonic() - self._last_report.get(job_id, 0) < config.OUTBOX_REPORT_INTERVAL:
+                continue
+            self._last_report[job_id] = time.monotonic()
+
+            async with db.get_session() as session:
+                job = await session.get(OutboxJob, job_id)
+                if job is None:
+                    self._last_report.pop(job_id, None)
+                    continue
+                if done and job.finished_at is None:
+                    job.finished_at = datetime.utcnow()
+                    await session.commit()
+            if done:
+                self._last_report.pop(job_id, None)
+                logger.info(f"[Outbox] Job #{job_id} '{job.label}' finished: {counts}")
+            if not job.report_chat_id:
+                continue
+
+            processed = sum(v for k, v in counts.items() if k in FINAL_STATUSES)
+            details = ", ".join(f"{k}: {v}" for k, v in sorted(counts.items()))
+            text = (f"{'✅ Розсилку завершено' if done else '📤 Розсилка триває'} "
+                    f"#{job_id}: {processed}/{job.total}\n{details}")
+            try:
+                if job.report_message_id:
+                    await bot.edit_message_text(text, chat_id=job.report_chat_id,
+                                                message_id=job.report_message_id, parse_mode=None)
+                else:
+                    await bot.send_message(job.report_chat_id, text, parse_mode=None)
+            except Exception as e:
+                logger.debug(f"[Outbox] Progress report for #{job_id} failed: {e}")
+
+    async def drain_once(self, bot: Bot) -> int:
+        """Надсилає одну пачку. Повертає кількість оброблених повідомлень."""
+        rows, jobs = await self._claim_batch()
+        if not rows:
+            return 0
+
+        claimed = len(rows)
+        items, orphans = [], set()
+        for row in rows:
+            job = jobs.get(row.job_id)
+            text = row.text if row.text is not None else (job.text if job else None)
+            if text is None:
+                # розсилку вже прибрали (OUTBOX_KEEP_DAYS), а спільний текст жив лише в ній
+                orphans.add(row.id)
+                continue
+            items.append(Outgoing(row.chat_id, text, parse_mode=job.parse_mode if job else None))
+        if orphans:
+            logger.warning(f"[Outbox] {len(orphans)} messages belong to a deleted job, marked failed.")
+            async with db.get_session() as session:
+                await session.execute(update(OutboxMessage).where(OutboxMessage.id.in_(orphans))
+                                      .values(status="failed"))
+                await session.commit()
+            rows = [row for row in rows if row.id not in orphans]
+        try:
+            await delivery.deliver(bot, items, label="outbox")
+        except asyncio.CancelledError:
+            await self._store_results(rows, items)
+            unsent = sum(1 for item in items if item.outcome is None and not item.in_flight)
+            logger.warning(f"[Outbox] Drain cancelled: {unsent} unsent messages returned to the queue.")
+            raise
+        await self._store_results(rows, items)
+        await self._report(bot, {row.job_id for row in rows})
+        return claimed
+
+    async def _run(self, bot: Bot):
+        while not self._stopping:
+            # до дренажу: enqueue під час пачки не повинен загубити пробудження
+            self._wakeup.clear()
+            try:
+                # між пачками перевіряємо, чи не зупиняється бот
+                while not self._stopping and await self.drain_once(bot):
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[Outbox] Drain failed: {e}")
+
+            if self._stopping:
+                break
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), config.OUTBOX_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self, bot: Bot):
+        await self.recover()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(bot))
+
+    async def stop(self):
+        """Дає поточній пачці дописатись (до OUTBOX_STOP_TIMEOUT), потім перериває."""
+        if self._task:
+            self._stopping = True
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), config.OUTBOX_STOP_TIMEOUT)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+            except Exception:
+                pass
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+outbox = Outbox()
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+import pytz
+from sqlalchemy import select
+
+from core.config import config
+import database.db as db
+from database.models import SourceChange
+from regions.registry import get_active_regions_list
+from services.scheduler import run_region_updates
+
+logger = logging.getLogger(__name__)
+KYIV_TZ = pytz.timezone('Europe/Kyiv')
+
+NIGHT_HOURS = range(0, 6)
+# півгодинний слот вважається "гарячим", якщо зміни в ньому були хоча б у стільки різних днів
+HOT_SLOT_MIN_DAYS = 2
+IDLE_BACKOFF = 1.5
+
+def _slot(local_dt):
+    return local_dt.hour * 2 + local_dt.minute // 30
+
+class AdaptivePoller:
+    """
+    Адаптивне опитування регіонів замість фіксованого крону 0,30.
+
+    З історії змін (source_changes) рахується, в які півгодини доби
+    джерело реально публікує графіки. Там опитуємо з мінімальним
+    інтервалом, вночі - з максимальним, а після серії "без змін"
+    інтервал поступово росте, вдень - не вище POLL_DAY_MAX_INTERVAL.
+    """
+
+    def __init__(self):
+        self._next_due = {}
+        self._idle_streak = {}
+        self._history = {}  # region -> {slot: {date, ...}}
+        self._running = set()
+        self._tasks = set()
+        self._loaded = False
+
+    async def load_history(self):
+        since = datetime.utcnow() - timedelta(days=config.POLL_HISTORY_DAYS)
+        async with db.get_session() as session:
+            result = await session.execute(
+                select(SourceChange.region, SourceChange.changed_at).where(SourceChange.changed_at >= since)
+            )
+            for region, changed_at in result.all():
+                self._remember(region, changed_at)
+        self._loaded = True
+
+    def _remember(self, region, changed_at_utc):
+        local = pytz.utc.localize(changed_at_utc).astimezone(KYIV_TZ)
+        self._history.setdefault(region, {}).setdefault(_slot(local), set()).add(local.date())
+
+    def hot_slots(self, region) -> set[int]:
+        cutoff = datetime.now(KYIV_TZ).date() - timedelta(days=config.POLL_HISTORY_DAYS)
+        hot = set()
+        for slot, days in self._history.get(region, {}).items():
+            days.difference_update([d for d in days if d < cutoff])
+            if len(days) >= HOT_SLOT_MIN_DAYS:
+                hot.add(slot)
+        return hot
+
+    def next_interval(self, region, now_local) -> int:
+        """Інтервал до наступного опитування регіону, хвилини."""
+        if now_local.hour in NIGHT_HOURS:
+            return config.POLL_MAX_INTERVAL
+        slot = _slot(now_local)
+        hot = self.hot_slots(region)
+        # поточна або наступна півгодина - вікно публікацій
+        if slot in hot or (slot + 1) % 48 in hot:
+            return config.POLL_MIN_INTERVAL
+        streak = self._idle_streak.get(region, 0)
+        interval = config.POLL_BASE_INTERVAL * IDLE_BACKOFF ** max(0, streak - 2)
+        return int(max(config.POLL_MIN_INTERVAL, min(config.POLL_DAY_MAX_INTERVAL, interval)))
+
+    async def _record_changes(self, results):
+        changed = [r.code for r in results if r.status == "changed"]
+        if not changed:
+            return
+        now = datetime.utcnow()
+        async with db.get_session() as session:
+            session.add_all(SourceChange(region=code, changed_at=now) for code in changed)
+            await session.commit()
+        for code in changed:
+            self._remember(code, now)
+
+    async def record(self, results):
+        """
+        Враховує результати оновлення: історія змін і наступний час опитування.
+        Викликається і з власного циклу, і після ручного оновлення з адмінки.
+        """
+        await self._record_changes(results)
+        now_local = datetime.now(KYIV_TZ)
+        for result in results:
+            if result.status == "changed":
+                self._idle_streak[result.code] = 0
+            elif result.status == "unchanged":
+                self._idle_streak[result.code] = self._idle_streak.get(result.code, 0) + 1
+            interval = self.next_interval(result.code, now_local)
+            self._next_due[result.code] = now_local + timedelta(minutes=interval)
+            logger.info(f"[Poller] {result.code}: наступне опитування через {interval} хв.")
+
+    async def _run(self, regions, on_changes):
+        try:
+            results = await run_region_updates(regions, on_changes=on_changes)
+            await self.record(results)
+        except Exception as e:
+            logger.error(f"[Poller] Цикл впав: {e}")
+        finally:
+            for region in regions:
+                self._running.discard(region.code)
+
+    async def tick(self, on_changes):
+        """Викликається щохвилини: запускає у фоні регіони, яким настав час."""
+        if not self._loaded:
+            await self.load_history()
+
+        now_local = datetime.now(KYIV_TZ)
+        due = [
+            r for r in get_active_regions_list()
+            if r.code not in self._running and self._next_due.get(r.code, now_local) <= now_local
+        ]
+        if not due:
+            return
+        for region in due:
+            self._running.add(region.code)
+        logger.info(f"[Poller] Опитую: {[r.code for r in due]}")
+        task = asyncio.create_task(self._run(due, on_changes))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+adaptive_poller = AdaptivePoller()
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+from core.config import config
+from core.browser import kill_zombie_processes, clean_temp_files
+from core.retry import retry_scheduler
+
+logger = logging.getLogger(__name__)
+
+# регіони, оновлення яких зараз виконується (крон і адмінка можуть перетнутися)
+_in_flight = {}
+# фонові задачі, що звільняють регіон після завершення його потоків
+_releasers = set()
+
+@dataclass
+class RegionUpdateResult:
+    code: str
+    name: str
+    status: str  # changed | unchanged | error | timeout | skipped
+    changed_groups: list[str] = field(default_factory=list)
+    changes: dict = field(default_factory=dict)  # group -> ScheduleDiff
+    duration: float = 0.0
+    error: str | None = None
+    note: str | None = None
+
+    def as_line(self) -> str:
+        if self.status == "changed":
+            return f"✅ {self.name}: ЗМІНИ! ({len(self.changed_groups)} груп) за {self.duration:.1f}с"
+        if self.status == "unchanged":
+            note = f", {self.note}" if self.note else ""
+            return f"✅ {self.name}: Без змін ({self.duration:.1f}с{note})"
+        if self.status == "timeout":
+            return f"⏱ {self.name}: Перевищено час ({self.duration:.0f}с)"
+        if self.status == "skipped":
+            return f"⏭ {self.name}: Вже оновлюється"
+        return f"❌ {self.name}: Помилка ({self.error})"
+
+def _release(code):
+    _in_flight[code] -= 1
+    if not _in_flight[code]:
+        del _in_flight[code]
+
+async def _release_when_idle(code):
+    await retry_scheduler.wait_idle(code)
+    logger.info(f"[Updater] {code}: потоки воркера завершились, регіон знову вільний.")
+    _release(code)
+
+async def _run_one(region, semaphore, timeout, on_changes):
+    # якщо попередній запуск лише чекає паузу між спробами, новий його перехоплює
+    if region.code in _in_flight and not retry_scheduler.is_backing_off(region.code):
+        logger.info(f"[Updater] {region.code} вже оновлюється, пропускаю.")
+        return RegionUpdateResult(region.code, region.name, "skipped")
+
+    _in_flight[region.code] = _in_flight.get(region.code, 0) + 1
+    retry_scheduler.reset(region.code)
+    try:
+        async with semaphore:
+            started = time.monotonic()
+            logger.info(f"[Updater] Оновлюю: {region.name}")
+            try:
+                changes = await asyncio.wait_for(region.update_data(), timeout)
+            except asyncio.TimeoutError:
+                # потік з браузером так не зупинити - просимо його вийти і тримаємо регіон зайнятим
+                retry_scheduler.cancel(region.code)
+                logger.error(f"[Updater] {region.name}: таймаут {timeout}с, "
+                             f"очікування перервано, воркеру надіслано сигнал зупинки.")
+                return RegionUpdateResult(region.code, region.name, "timeout",
+                                          duration=time.monotonic() - started)
+            except Exception as e:
+                logger.error(f"[Updater] Помилка в {region.name}: {e}")
+                return RegionUpdateResult(region.code, region.name, "error",
+                                          duration=time.monotonic() - started, error=str(e))
+
+            result = RegionUpdateResult(
+                region.code, region.name,
+                "changed" if changes else "unchanged",
+                changed_groups=list(changes or []),
+                changes=dict(changes or {}),
+                duration=time.monotonic() - started,
+                note=region.last_update_note,
+            )
+    finally:
+        if retry_scheduler.busy(region.code):
+            task = asyncio.create_task(_release_when_idle(region.code))
+            _releasers.add(task)
+            task.add_done_callback(_releasers.discard)
+        else:
+            _release(region.code)
+
+    if result.changed_groups:
+        logger.info(f"[Updater] Зміни в {region.code}: {result.changed_groups}")
+        if on_changes:
+            try:
+                await on_changes(region.code, result.changes)
+            except Exception as e:
+                logger.error(f"[Updater] Розсилка для {region.code} впала: {e}")
+    return result
+
+async def run_region_updates(regions, on_changes=None, concurrency=None, timeout=None) -> list[RegionUpdateResult]:
+    """
+    Оновлює регіони паралельно: не більше concurrency одночасно, кожен
+    з власним таймаутом. Збій чи зависання одного регіону не затримує інші.
+    on_changes(region_code, changes) викликається одразу після
+    завершення відповідного регіону.
+    """
+    concurrency = concurrency or config.REGION_UPDATE_CONCURRENCY
+    timeout = timeout or config.REGION_UPDATE_TIMEOUT
+    semaphore = asyncio.Semaphore(concurrency)
+
+    # прибирання блокує, тому виносимо в потік. Реєстр вбиває лише наші
+    # звільнені процеси, а temp-теки Chrome чистимо, тільки коли ніхто не качає
+    await asyncio.to_thread(kill_zombie_processes)
+    if not _in_flight:
+        await asyncio.to_thread(clean_temp_files)
+
+    started = time.monotonic()
+    results = await asyncio.gather(*(_run_one(r, semaphore, timeout, on_changes) for r in regions))
+
+    await asyncio.to_thread(kill_zombie_processes)
+
+    logger.info(f"[Updater] Цикл завершено за {time.monotonic() - started:.1f}с: "
+                + ", ".join(f"{r.code}={r.status}" + (f" ({r.note})" if r.note else "") for r in results))
+    return results
@@ -0,0 +1,230 @@
+import logging
+from array import array
+
+from sqlalchemy import select, update
+
+import database.db as db
+from core.config import config
+from database.models import User
+from services.delivery import delivery
+
+logger = logging.getLogger(__name__)
+
+# режим сповіщень -> байт у масиві режимів
+MODE_CODES = {"off": 0, "always": 1, "no_night": 2}
+
+class _GroupSubscribers:
+    __slots__ = ("ids", "modes", "leads")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.modes = array("B")
+        # за скільки хвилин попереджати про відключення (лише в _regions)
+        self.leads = array("H")
+
+# раніше реєстрація писала всім "00:00" - це не вибір користувача, а заглушка
+LEGACY_UNSET_TIME = "00:00"
+
+def alert_minute(alert_time: str | None) -> int | None:
+    """
+    "08:30" -> 510 (хвилина доби). Не заданий час (і старе "00:00") -
+    config.DIGEST_DEFAULT_TIME. None, якщо час зіпсований.
+    """
+    if not alert_time or alert_time == LEGACY_UNSET_TIME:
+        alert_time = config.DIGEST_DEFAULT_TIME
+    try:
+        hours, minutes = alert_time.split(":")
+        return (int(hours) * 60 + int(minutes)) % 1440
+    except (AttributeError, ValueError):
+        return None
+
+def _lead(lead_minutes: int | None) -> int:
+    return config.ALERT_DEFAULT_LEAD if lead_minutes is None else max(0, int(lead_minutes))
+
+def _add(container, key, user_id, mode_code, lead=None):
+    subs = container.get(key)
+    if subs is None:
+        subs = container[key] = _GroupSubscribers()
+    subs.ids.append(user_id)
+    subs.modes.append(mode_code)
+    if lead is not None:
+        subs.leads.append(lead)
+
+def _find(containers, user_id):
+    for container in containers:
+        for key, subs in container.items():
+            try:
+                return container, key, subs.ids.index(user_id)
+            except ValueError:
+                continue
+    return None, None, None
+
+def _allowed_modes(quiet_hours):
+    if quiet_hours:
+        return (MODE_CODES["always"],)
+    return (MODE_CODES["always"], MODE_CODES["no_night"])
+
+class SubscriberIndex:
+    """
+    Підписники в пам'яті: region -> group -> масиви user_id і режимів,
+    плюс кошики щоденного дайджесту: хвилина alert_time -> (region, group) -> ті ж масиви.
+
+    Вантажиться один раз при старті, далі оновлюється хендлерами
+    налаштувань. Розсилки беруть отримувачів звідси без запитів до БД;
+    на користувача йде 11 байт (+9 з дайджестом) замість ORM-об'єкта User.
+    """
+
+    def __init__(self):
+        self._regions = {}
+        self._alerts = {}
+        self._count = 0
+        # func() після змін (дайджест і попередження перераховують свої таймери)
+        self._listeners = []
+
+    def add_change_listener(self, func):
+        self._listeners.append(func)
+
+    async def load(self):
+        regions = {}
+        alerts = {}
+        count = 0
+        async with db.get_session() as session:
+            result = await session.stream(
+                select(User.user_id, User.region, User.group_number, User.notification_mode,
+                       User.alert_time, User.alert_lead_minutes)
+            )
+            async for user_id, region, group, mode, alert_time, lead in result:
+                code = MODE_CODES.get(mode, MODE_CODES["no_night"])
+                _add(regions.setdefault(region, {}), group, user_id, code, _lead(lead))
+                minute = alert_minute(alert_time)
+                if minute is not None:
+                    _add(alerts.setdefault(minute, {}), (region, group), user_id, code)
+                count += 1
+        self._regions = regions
+        self._alerts = alerts
+        self._count = count
+        logger.info(f"[Subscribers] Loaded {count} users, {len(alerts)} digest minutes.")
+        self._changed()
+
+    def _changed(self):
+        for listener in self._listeners:
+            listener()
+
+    def _remove(self, containers, user_id) -> bool:
+        container, key, i = _find(containers, user_id)
+        if container is None:
+            return False
+        subs = container[key]
+        del subs.ids[i]
+        del subs.modes[i]
+        if subs.leads:
+            del subs.leads[i]
+        if not subs.ids:
+            del container[key]
+        return True
+
+    def set_user(self, user_id: int, region: str, group: str, mode: str, alert_time: str | None = None,
+                 lead_minutes: int | None = None):
+        """Користувач (пере)обрав регіон і групу."""
+        if self._remove(self._regions.values(), user_id):
+            self._count -= 1
+        self._remove(self._alerts.values(), user_id)
+        for minute in [m for m, buckets in self._alerts.items() if not buckets]:
+            del self._alerts[minute]
+
+        code = MODE_CODES.get(mode, MODE_CODES["no_night"])
+        _add(self._regions.setdefault(region, {}), group, user_id, code, _lead(lead_minutes))
+        minute = alert_minute(alert_time)
+        if minute is not None:
+            _add(self._alerts.setdefault(minute, {}), (region, group), user_id, code)
+        self._count += 1
+        self._changed()
+
+    def set_mode(self, user_id: int, mode: str):
+        code = MODE_CODES.get(mode, MODE_CODES["no_night"])
+        for containers in (self._regions.values(), self._alerts.values()):
+            container, key, i = _find(containers, user_id)
+            if container is not None:
+                container[key].modes[i] = code
+
+    def set_lead(self, user_id: int, lead_minutes: int):
+        container, key, i = _find(self._regions.values(), user_id)
+        if container is None:
+            return
+        container[key].leads[i] = _lead(lead_minutes)
+        self._changed()
+
+    def recipients(self, region: str, group: str, quiet_hours: bool = False, lead: int | None = None) -> list[int]:
+        """
+        user_id підписників групи з увімкненими сповіщеннями (у тихі години - лише "always").
+        lead - лише ті, хто просив попереджати за стільки хвилин.
+        """
+        subs = self._regions.get(region, {}).get(group)
+        if subs is None:
+            return []
+        allowed = _allowed_modes(quiet_hours)
+        if lead is None:
+            return [uid for uid, mode in zip(subs.ids, subs.modes) if mode in allowed]
+        return [uid for uid, mode, user_lead in zip(subs.ids, subs.modes, subs.leads)
+                if mode in allowed and user_lead == lead]
+
+    def night_muted(self, region: str, group: str) -> list[int]:
+        """user_id групи в режимі "no_night" - їм уночі нічого не надсилаємо, лише відкладаємо."""
+        subs = self._regions.get(region, {}).get(group)
+        if subs is None:
+            return []
+        muted = MODE_CODES["no_night"]
+        return [uid for uid, mode in zip(subs.ids, subs.modes) if mode == muted]
+
+    def leads(self, region: str, group: str) -> set[int]:
+        """Різні lead-часи підписників групи з увімкненими сповіщеннями."""
+        subs = self._regions.get(region, {}).get(group)
+        if subs is None:
+            return set()
+        off = MODE_CODES["off"]
+        return {lead for mode, lead in zip(subs.modes, subs.leads) if mode != off}
+
+    def alert_minutes(self) -> list[int]:
+        """Хвилини доби, на які є хоч один дайджест."""
+        return sorted(self._alerts)
+
+    def digest_recipients(self, minute: int, quiet_hours: bool = False) -> dict[tuple[str, str], list[int]]:
+        """(region, group) -> user_id тих, кому дайджест о цій хвилині."""
+        allowed = _allowed_modes(quiet_hours)
+        result = {}
+        for key, subs in self._alerts.get(minute, {}).items():
+            ids = [uid for uid, mode in zip(subs.ids, subs.modes) if mode in allowed]
+            if ids:
+                result[key] = ids
+        return result
+
+    def digest_night_muted(self, minute: int) -> dict[tuple[str, str], list[int]]:
+        """Як digest_recipients, але лише "no_night" - для дайджестів, що припали на ніч."""
+        muted = MODE_CODES["no_night"]
+        result = {}
+        for key, subs in self._alerts.get(minute, {}).items():
+            ids = [uid for uid, mode in zip(subs.ids, subs.modes) if mode == muted]
+            if ids:
+                result[key] = ids
+        return result
+
+    async def mute_dead_chats(self, user_ids: list[int]):
+        """
+        Бот заблокований або чату немає: вимикаємо сповіщення (notification_mode="off"),
+        щоб наступні розсилки їх не чіпали. Увімкнути назад можна в налаштуваннях.
+        """
+        async with db.get_session() as session:
+            await session.execute(update(User).where(User.user_id.in_(user_ids)).values(notification_mode="off"))
+            await session.commit()
+        for user_id in user_ids:
+            self.set_mode(user_id, "off")
+        logger.info(f"[Subscribers] {len(user_ids)} dead chats muted.")
+
+    def all_user_ids(self) -> list[int]:
+        return [uid for groups in self._regions.values() for subs in groups.values() for uid in subs.ids]
+
+    def count(self) -> int:
+        return self._count
+
+subscriber_index = SubscriberIndex()
+delivery.add_dead_chat_listener(subscriber_index.mute_dead_chats)
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+import pytz
+
+from core.schedule_bits import SLOTS, DayMask
+from database.schedules import add_save_listener, load_day_masks
+
+logger = logging.getLogger(__name__)
+KYIV_TZ = pytz.timezone('Europe/Kyiv')
+
+def _shift_date(date: str, days: int) -> str:
+    return (datetime.strptime(date, "%Y-%m-%d") + timedelta(days=days)).strftime("%Y-%m-%d")
+
+def _bit_slots(mask: int):
+    while mask:
+        yield (mask & -mask).bit_length() - 1
+        mask &= mask - 1
+
+class TransitionIndex:
+    """
+    Індекс переходів світло -> відключення: (date, slot) -> {(region, group)},
+    де slot - перший слот відключення, а попередній слот (можливо, 47-й
+    попередньої доби) був "on". Так само для повернення світла (off -> on).
+
+    Дата вантажиться з БД одним запитом при першому зверненні, далі індекс
+    оновлюється з save_schedules, тож перевірка - пошук у словнику.
+    """
+
+    def __init__(self):
+        self._masks = {}         # date -> {(region, group): DayMask}
+        self._transitions = {}   # date -> {slot: set((region, group))}, початок відключення
+        self._restores = {}      # date -> {slot: set((region, group))}, повернення світла
+        # дати, що саме вантажаться: date -> (future, [(region, {group: DayMask})] з save_schedules)
+        self._loading = {}
+        # func(date) після перебудови дати (напр. планувальник попереджень)
+        self.listeners = []
+
+    async def ensure_loaded(self, date: str):
+        if date in self._masks:
+            return
+        if date in self._loading:
+            await asyncio.shield(self._loading[date][0])
+            return
+
+        done, saved = asyncio.get_running_loop().create_future(), []
+        self._loading[date] = (done, saved)
+        try:
+            masks = await load_day_masks(date)
+            # збереження, що прийшли під час SELECT, новіші за прочитане
+            for region, group_masks in saved:
+                for group, mask in group_masks.items():
+                    masks[(region, group)] = mask
+            self._masks[date] = masks
+        finally:
+            del self._loading[date]
+            done.set_result(None)
+        self._rebuild(date)
+        # наступна доба залежить від 47-го слоту цієї
+        if _shift_date(date, 1) in self._masks:
+            self._rebuild(_shift_date(date, 1))
+        self._prune()
+
+    def _prune(self):
+        # вчорашня доба ще потрібна для переходів о 00:00 сьогодні
+        oldest = _shift_date(datetime.now(KYIV_TZ).strftime("%Y-%m-%d"), -1)
+        for date in [d for d in self._masks if d < oldest]:
+            del self._masks[date]
+            self._transitions.pop(date, None)
+            self._restores.pop(date, None)
+
+    def _rebuild(self, date: str):
+        previous = self._masks.get(_shift_date(date, -1), {})
+        transitions = {}
+        restores = {}
+        for key, mask in self._masks[date].items():
+            # біт s: слот s "off", а слот s-1 "on" (і навпаки для повернення світла)
+            starts = mask.off & (mask.on << 1)
+            ends = mask.on & (mask.off << 1)
+            prev_mask = previous.get(key)
+            if prev_mask is not None:
+                if mask.is_off(0) and prev_mask.is_on(SLOTS - 1):
+                    starts |= 1
+                if mask.is_on(0) and prev_mask.is_off(SLOTS - 1):
+                    ends |= 1
+            for slot in _bit_slots(starts):
+                transitions.setdefault(slot, set()).add(key)
+            for slot in _bit_slots(ends):
+                restores.setdefault(slot, set()).add(key)
+        self._transitions[date] = transitions
+        self._restores[date] = restores
+        for listener in self.listeners:
+            listener(date)
+
+    def on_saved(self, region: str, date: str, masks: dict[str, DayMask]):
+        """Слухач save_schedules: перебудовує лише вже завантажені дати."""
+        if date in self._loading:
+            self._loading[date][1].append((region, dict(masks)))
+            return
+        if date not in self._masks:
+            return
+        for group, mask in masks.items():
+            self._masks[date][(region, group)] = mask
+        self._rebuild(date)
+        if _shift_date(date, 1) in self._masks:
+            self._rebuild(_shift_date(date, 1))
+
+    def events(self, date: str):
+        """Усі переходи завантаженої дати: [(slot, "off" | "on", (region, group))]."""
+        result = []
+        for kind, index in (("off", self._transitions), ("on", self._restores)):
+            for slot, keys in index.get(date, {}).items():
+                result.extend((slot, kind, key) for key in keys)
+        return result
+
+transition_index = TransitionIndex()
+add_save_listener(transition_index.on_saved)